@@ -17,6 +17,11 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+try:
+    import orjson  # Optional: faster encoding of large search responses
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -67,6 +72,11 @@ def get_s3_parameters() -> Dict[str, str]:
     
     return s3_params
 
+def _invalidate_search_cache():
+    """Drop cached S3 listings after the bucket content changed."""
+    if search_module and hasattr(search_module, 'invalidate_listing_cache'):
+        search_module.invalidate_listing_cache()
+
 def handle_rename(args: Dict[str, Any]) -> Dict[str, Any]:
     """Handle rename operations with full S3 support."""
     
@@ -117,6 +127,7 @@ def handle_rename(args: Dict[str, Any]) -> Dict[str, Any]:
             result['s3_supported'] = True
             
             if result.get('success'):
+                _invalidate_search_cache()
                 logger.info("MAIN HANDLER: ✅ Rename operation completed successfully")
             else:
                 logger.error(f"MAIN HANDLER: ❌ Rename operation failed: {result.get('error', 'Unknown error')}")
@@ -543,6 +554,30 @@ def handle_search(args):
         logger.warning("Search module not available, using fallback")
         return fallback_search(args)
 
+def handle_rename_many(args):
+    """Handle batch renames: parallel copies, then bulk deletes of the originals."""
+    if rename_module and hasattr(rename_module, 'rename_many'):
+        try:
+            logger.info(f"Executing batch rename of {len(args.get('renames') or [])} files")
+            for key, value in get_s3_parameters().items():
+                args.setdefault(key, value)
+            result = rename_module.rename_many(args)
+            # Also after a partial failure: the renamed objects already moved
+            if isinstance(result, dict) and result.get('renamed'):
+                _invalidate_search_cache()
+            return result
+        except Exception as e:
+            logger.error(f"Batch rename operation failed: {str(e)}")
+            return {
+                "success": False,
+                "error": f"Batch rename failed: {str(e)}"
+            }
+    else:
+        return {
+            "success": False,
+            "error": "Rename module not available"
+        }
+
 def handle_delete(args):
     """Handle delete operations synchronously."""
     if delete_module and hasattr(delete_module, 'main'):
@@ -557,6 +592,8 @@ def handle_delete(args):
                     loop.close()
             else:
                 result = delete_module.main(args)
+            if isinstance(result, dict) and result.get('success'):
+                _invalidate_search_cache()
             return result
         except Exception as e:
             logger.error(f"Delete operation failed: {str(e)}")
@@ -668,7 +705,7 @@ def handle_filemanager(args):
     return {
         "success": True,
         "message": "Filemanager is running",
-        "available_operations": ["search", "delete", "rename", "download", "test"],
+        "available_operations": ["search", "delete", "rename", "rename_many", "download", "test"],
         "modules_loaded": {
             "search": search_module is not None,
             "delete": delete_module is not None,
@@ -693,6 +730,7 @@ HANDLERS = {
     'search': handle_search,
     'delete': handle_delete,
     'rename': handle_rename,
+    'rename_many': handle_rename_many,
     'download': handle_download,
     'filemanager': handle_filemanager,
     'test': handle_test
@@ -742,7 +780,18 @@ def main(args):
     This matches the expected serverless function signature.
     """
     result = process_request(args)
-    return {"body": result}
+    # Encode the body here, the runtime passes a pre-encoded JSON string through as is.
+    # Datetimes and dataclasses go through default=str as in json.dumps, so both encode alike
+    body = None
+    if orjson:
+        try:
+            options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+            body = orjson.dumps(result, default=str, option=options).decode()
+        except orjson.JSONEncodeError as e:
+            logger.warning(f"orjson could not encode the response, falling back: {str(e)}")
+    if body is None:
+        body = json.dumps(result, default=str)
+    return {"body": body, "headers": {"Content-Type": "application/json"}}
 
 # For backwards compatibility
 def search_files(args):
@@ -8,10 +8,21 @@
 #--param S3_API_URL $S3_API_URL
 
 import os
+import re
 import json
 import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from datetime import datetime
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+
+MAX_DELETE_BATCH = 1000  # DeleteObjects accepts at most 1000 keys per request
+MAX_COPY_WORKERS = 8
+
+# Characters not allowed in a filename: reserved ones and control characters
+_INVALID_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
 
 def main(args):
     """S3-based rename function - renames objects in S3 bucket."""
@@ -69,6 +80,11 @@ def main(args):
         old_key = old_path.lstrip('/')
         print(f"S3 RENAME: old_key='{old_key}'")
         
+        # Split the key once: directory prefix (with trailing '/') and filename
+        idx = old_key.rfind('/')
+        prefix = old_key[:idx + 1]
+        old_name = old_key[idx + 1:]
+        
         # Check if the object exists in S3
         print("S3 RENAME: Checking if object exists...")
         try:
@@ -76,6 +92,7 @@ def main(args):
             print(f"S3 RENAME: ✅ Object exists - Size: {response.get('ContentLength', 0)} bytes")
             object_exists = True
             content_type = response.get('ContentType', 'application/octet-stream')
+            etag = response.get('ETag')
         except Exception as e:
             print(f"S3 RENAME: ❌ Object does not exist: {e}")
             
@@ -88,8 +105,7 @@ def main(args):
                     print(f"S3 RENAME: Found objects: {keys}")
                     
                     # Try to find similar keys
-                    old_filename = old_key.split('/')[-1] if '/' in old_key else old_key
-                    similar_keys = [k for k in keys if old_filename.lower() in k.lower()]
+                    similar_keys = [k for k in keys if old_name.lower() in k.lower()]
                     if similar_keys:
                         print(f"S3 RENAME: Similar keys found: {similar_keys}")
                 else:
@@ -100,12 +116,29 @@ def main(args):
             return {"success": False, "error": f"Object not found in S3: {old_key}"}
         
         # Create new key - same path but different filename
-        old_path_parts = old_key.split('/')
-        old_path_parts[-1] = new_name  # Replace the filename
-        new_key = '/'.join(old_path_parts)
+        new_key = prefix + new_name
         
         print(f"S3 RENAME: new_key='{new_key}'")
-        
+
+        # Renaming to the same name is a no-op: skip the copy + delete entirely.
+        # Note: S3 (and MinIO through the S3 API) has no server-side rename, so
+        # any real rename below still needs a server-side copy followed by a delete.
+        if new_key == old_key:
+            print("S3 RENAME: ✅ Source and target are the same, nothing to do")
+            return {
+                "success": True,
+                "message": f"'{new_name}' already has this name",
+                "old_path": f"/{old_key}",
+                "new_path": f"/{new_key}",
+                "old_name": old_name,
+                "new_name": new_name,
+                "bucket": bucket,
+                "renamed_at": datetime.now().isoformat(),
+                "method": "s3_noop",
+                "s3_rename_implemented": True,
+                "implementation_status": "working"
+            }
+
         # Check if target already exists
         print("S3 RENAME: Checking if target exists...")
         try:
@@ -120,13 +153,23 @@ def main(args):
         copy_source = {'Bucket': bucket, 'Key': old_key}
         
         try:
+            # Only copy the bytes we checked above: fail if a concurrent writer replaced them
+            copy_condition = {'CopySourceIfMatch': etag} if etag else {}
             client.copy_object(
                 CopySource=copy_source,
                 Bucket=bucket,
                 Key=new_key,
-                MetadataDirective='COPY'  # Keep original metadata
+                MetadataDirective='COPY',  # Keep original metadata
+                **copy_condition
             )
             print("S3 RENAME: ✅ Copy successful")
+        except ClientError as copy_error:
+            code = copy_error.response.get('Error', {}).get('Code')
+            if code in ('PreconditionFailed', '412'):
+                print("S3 RENAME: ❌ Source changed during rename")
+                return {"success": False, "error": f"Source changed during rename: {old_key}"}
+            print(f"S3 RENAME: ❌ Copy failed: {copy_error}")
+            return {"success": False, "error": f"Copy failed: {str(copy_error)}"}
         except Exception as copy_error:
             print(f"S3 RENAME: ❌ Copy failed: {copy_error}")
             return {"success": False, "error": f"Copy failed: {str(copy_error)}"}
@@ -166,9 +209,6 @@ def main(args):
         if new_exists and not old_exists:
             print("S3 RENAME: 🎉 SUCCESS!")
             
-            # Extract names for response
-            old_name = old_key.split('/')[-1] if '/' in old_key else old_key
-            
             result = {
                 "success": True,
                 "message": f"Successfully renamed '{old_name}' to '{new_name}' in S3",
@@ -199,12 +239,134 @@ def main(args):
         traceback.print_exc()
         return {"success": False, "error": f"S3 rename failed: {str(e)}"}
 
+def rename_many(args):
+    """S3-based batch rename - copies in parallel, then bulk-deletes the originals."""
+
+    renames = args.get('renames') or []
+    print(f"S3 RENAME BATCH: {len(renames)} renames requested")
+
+    if not renames:
+        return {"success": False, "error": "renames required"}
+
+    # Validate everything before touching the bucket
+    plan = []
+    old_keys = set()
+    for item in renames:
+        old_path = (item.get('old_path') or '').strip()
+        new_name = (item.get('new_name') or '').strip()
+        if not old_path or not new_name:
+            return {"success": False, "error": "each rename needs old_path and new_name"}
+        if not is_valid_filename(new_name):
+            return {"success": False, "error": f"Invalid filename: {new_name}"}
+
+        old_key = old_path.lstrip('/')
+        new_key = old_key[:old_key.rfind('/') + 1] + new_name
+        old_keys.add(old_key)
+        if new_key != old_key:
+            plan.append((old_key, new_key))
+
+    # The copies run in parallel and each checks only its own target: two renames to the
+    # same key, or onto a key that is itself renamed, would overwrite and then delete data
+    new_keys = set()
+    for _, new_key in plan:
+        if new_key in new_keys:
+            return {"success": False, "error": f"Duplicate target: /{new_key}"}
+        if new_key in old_keys:
+            return {"success": False, "error": f"Target is also renamed in this batch: /{new_key}"}
+        new_keys.add(new_key)
+
+    try:
+        client, bucket = s3client(args)
+
+        def copy(pair):
+            old_key, new_key = pair
+            try:
+                etag = client.head_object(Bucket=bucket, Key=old_key).get('ETag')
+            except Exception:
+                raise Exception(f"Object not found in S3: {old_key}")
+            try:
+                client.head_object(Bucket=bucket, Key=new_key)
+                target_exists = True
+            except:
+                target_exists = False
+            if target_exists:
+                raise Exception(f"Target already exists: {new_key}")
+            # Same as main: only copy the bytes checked above, a concurrent writer fails the copy
+            copy_condition = {'CopySourceIfMatch': etag} if etag else {}
+            try:
+                client.copy_object(
+                    CopySource={'Bucket': bucket, 'Key': old_key},
+                    Bucket=bucket,
+                    Key=new_key,
+                    MetadataDirective='COPY',
+                    **copy_condition
+                )
+            except ClientError as copy_error:
+                if copy_error.response.get('Error', {}).get('Code') in ('PreconditionFailed', '412'):
+                    raise Exception(f"Source changed during rename: {old_key}")
+                raise
+            return pair
+
+        # Step 1 - copy all objects concurrently
+        copied = []
+        failed = []
+        with ThreadPoolExecutor(max_workers=MAX_COPY_WORKERS) as executor:
+            futures = {executor.submit(copy, pair): pair for pair in plan}
+            for future in as_completed(futures):
+                old_key, new_key = futures[future]
+                try:
+                    copied.append(future.result())
+                except Exception as copy_error:
+                    print(f"S3 RENAME BATCH: ❌ Copy {old_key} -> {new_key} failed: {copy_error}")
+                    failed.append({"old_path": f"/{old_key}", "error": str(copy_error)})
+
+        if failed:
+            # Roll back the copies that did succeed, all in one request
+            print(f"S3 RENAME BATCH: Rolling back {len(copied)} copies...")
+            delete_keys(client, bucket, [new_key for _, new_key in copied])
+            return {"success": False, "error": f"{len(failed)} copies failed", "failed": failed}
+
+        # Step 2 - delete all originals with bulk requests
+        print(f"S3 RENAME BATCH: Deleting {len(copied)} originals...")
+        errors = delete_keys(client, bucket, [old_key for old_key, _ in copied])
+
+        return {
+            "success": not errors,
+            "renamed": [{"old_path": f"/{old_key}", "new_path": f"/{new_key}"} for old_key, new_key in copied],
+            "failed": errors,
+            "bucket": bucket,
+            "renamed_at": datetime.now().isoformat(),
+            "method": "s3_copy_bulk_delete"
+        }
+
+    except Exception as e:
+        print(f"S3 RENAME BATCH: ❌ CRITICAL ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return {"success": False, "error": f"S3 batch rename failed: {str(e)}"}
+
+main_batch = rename_many
+
+def delete_keys(client, bucket, keys):
+    """Delete keys with DeleteObjects, up to 1000 per request; returns the failures."""
+    errors = []
+    for i in range(0, len(keys), MAX_DELETE_BATCH):
+        batch = keys[i:i + MAX_DELETE_BATCH]
+        response = client.delete_objects(
+            Bucket=bucket,
+            Delete={'Objects': [{'Key': k} for k in batch], 'Quiet': True}
+        )
+        for err in response.get('Errors', []):
+            print(f"S3 RENAME BATCH: ❌ Delete {err.get('Key')} failed: {err.get('Message')}")
+            errors.append({"old_path": f"/{err.get('Key')}", "error": err.get('Message')})
+    return errors
+
 def s3client(args):
     """Create S3 client - same as download.py"""
     base = args.get("S3_API_URL") or args.get("S3_HOST")
-    key = args.get("S3_ACCESS_KEY", os.environ.get("S3_ACCESS_KEY"))
-    sec = args.get("S3_SECRET_KEY", os.environ.get("S3_SECRET_KEY"))
-    bucket = args.get("S3_BUCKET_DATA", os.environ.get("S3_BUCKET_DATA"))
+    key = args.get("S3_ACCESS_KEY") or _env("S3_ACCESS_KEY")
+    sec = args.get("S3_SECRET_KEY") or _env("S3_SECRET_KEY")
+    bucket = args.get("S3_BUCKET_DATA") or _env("S3_BUCKET_DATA")
     port = args.get("S3_PORT", "443")
     
     print(f"S3 CONFIG:")
@@ -214,24 +376,40 @@ def s3client(args):
     print(f"  Secret Key: {'*' * len(sec) if sec else '(missing)'}")
     print(f"  Bucket: {bucket}")
     
-    # Handle port in URL
+    if not key or not sec or not bucket:
+        raise Exception(f"Missing S3 credentials: key={bool(key)}, secret={bool(sec)}, bucket={bool(bucket)}")
+    
+    return _client(_endpoint(base, port), key, sec), bucket
+
+@lru_cache(maxsize=4)
+def _client(endpoint_url, key, sec):
+    """Build the S3 client once per endpoint/credentials and reuse it while the container is warm.
+    
+    boto3 clients are thread-safe and keep their urllib3 connection pool, so later calls
+    skip client construction and reuse open keep-alive connections instead of new TLS handshakes.
+    """
+    return boto3.client('s3', 
+                        region_name='us-east-1', 
+                        endpoint_url=endpoint_url, 
+                        aws_access_key_id=key, 
+                        aws_secret_access_key=sec,
+                        config=Config(tcp_keepalive=True))
+
+@lru_cache(maxsize=8)
+def _env(name):
+    """Read an environment variable once, it is fixed for the life of the container (cache_clear rereads it)."""
+    return os.environ.get(name)
+
+@lru_cache(maxsize=8)
+def _endpoint(base, port):
+    """Build the endpoint URL, adding protocol and port to a bare host."""
     if base and not base.startswith("http"):
         protocol = "https" if port == "443" else "http"
         if port not in ["80", "443"]:
             base = f"{protocol}://{base}:{port}"
         else:
             base = f"{protocol}://{base}"
-    
-    if not key or not sec or not bucket:
-        raise Exception(f"Missing S3 credentials: key={bool(key)}, secret={bool(sec)}, bucket={bool(bucket)}")
-    
-    client = boto3.client('s3', 
-                         region_name='us-east-1', 
-                         endpoint_url=base, 
-                         aws_access_key_id=key, 
-                         aws_secret_access_key=sec)
-    
-    return client, bucket
+    return base
 
 def is_valid_filename(filename):
     """Basic filename validation."""
@@ -244,13 +422,8 @@ def is_valid_filename(filename):
     if filename in ['.', '..']:
         return False
     
-    # Check for invalid characters
-    invalid_chars = '<>:"/\\|?*'
-    if any(char in filename for char in invalid_chars):
-        return False
-    
-    # Check for control characters
-    if any(ord(char) < 32 for char in filename):
+    # Check for invalid and control characters
+    if _INVALID_CHARS.search(filename):
         return False
     
     # Check length
@@ -272,36 +445,10 @@ def get_implementation_status():
         "status": "fully_implemented"
     }
 
-def handle_rename_request(args):
-    """Alternative entry point in case main() is being blocked."""
-    print("RENAME: Using alternative entry point...")
-    return main(args)
-
-# Backward compatibility functions
-def main_handler(args):
-    """Backward compatibility wrapper."""
-    return main(args)
-
-def rename_file_s3(args):
-    """S3-specific rename function."""
-    return main(args)
-    """Test the S3 rename function."""
-    
-    # You'll need to provide real S3 credentials for this to work
-    test_args = {
-        "old_path": "/test-file.txt",
-        "new_name": "renamed-test-file.txt",
-        "S3_HOST": "your-s3-host",
-        "S3_ACCESS_KEY": "your-access-key",
-        "S3_SECRET_KEY": "your-secret-key", 
-        "S3_BUCKET_DATA": "your-bucket"
-    }
-    
-    print("Testing S3 rename...")
-    result = main(test_args)
-    print(f"Test result: {json.dumps(result, indent=2)}")
-    return result
+# Alternative entry points and backward compatibility names, all plain aliases of main
+handle_rename_request = main
+main_handler = main
+rename_file_s3 = main
 
 if __name__ == "__main__":
     print("S3 Rename module loaded")
-    # Uncomment to test: test_s3_rename()
\ No newline at end of file
@@ -15,20 +15,35 @@ FIXED: Now shows ALL files in bucket without limits.
 import os
 import json
 import asyncio
+import codecs
 import fnmatch
+import heapq
+import math
 import mimetypes
 import re
+import time
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Set, Tuple
-from dataclasses import dataclass, asdict
-from datetime import datetime
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional, Set, Tuple
+from dataclasses import dataclass
+from enum import Enum
+from datetime import datetime, timezone
+from contextlib import aclosing
 from concurrent.futures import ThreadPoolExecutor
-from functools import lru_cache
+from functools import lru_cache, partial
+from operator import itemgetter
+from hashlib import blake2b
 import logging
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
 import io
 
+try:
+    import hyperscan  # Optional: bulk wildcard matching of S3 names
+except ImportError:
+    hyperscan = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -36,6 +51,12 @@ logger = logging.getLogger(__name__)
 # Constants
 MAX_CONTENT_SIZE = 10 * 1024 * 1024  # 10MB max for content search
 CHUNK_SIZE = 8192  # For reading files in chunks
+STREAM_CHUNK_SIZE = CHUNK_SIZE * 16  # For streaming S3 objects during content search
+S3_PAGE_SIZE = 1000  # Keys per ListObjectsV2 request (the S3 maximum)
+S3_MAX_CONCURRENCY = 32  # Parallel GetObject calls for content search
+S3_LISTING_SHARDS = 8  # Key ranges listed in parallel for prefixes with more than one page
+CONTENT_QUEUE_SIZE = 1000  # Content-search candidates listed ahead of the workers
+DATE_FORMATS = ('%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S')  # Fallbacks for non-ISO dates
 TEXT_EXTENSIONS = {'.txt', '.md', '.py', '.js', '.jsx', '.ts', '.tsx', '.java', 
                    '.c', '.cpp', '.h', '.hpp', '.cs', '.php', '.rb', '.go',
                    '.rs', '.swift', '.kt', '.scala', '.r', '.m', '.sql',
@@ -43,31 +64,431 @@ TEXT_EXTENSIONS = {'.txt', '.md', '.py', '.js', '.jsx', '.ts', '.tsx', '.java',
                    '.toml', '.ini', '.cfg', '.conf', '.log', '.csv', '.html',
                    '.htm', '.css', '.scss', '.sass', '.less'}
 
-@dataclass
+# boto3 clients are thread-safe: a single client per endpoint/credentials is shared by
+# all executor threads and kept across warm invocations. Its connection pool must be at
+# least as large as the number of concurrent requests, otherwise the extra connections
+# are discarded after use and every GetObject pays a new TCP/TLS handshake.
+S3_CLIENT_CONFIG = Config(
+    max_pool_connections=2 * S3_MAX_CONCURRENCY,
+    retries={'max_attempts': 3, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+_S3_CLIENTS: Dict[Tuple[str, str, str, str], Any] = {}
+
+# Recent listings of (endpoint, bucket, prefix), as pages of (key, size, last_modified) tuples,
+# so repeated searches within LISTING_CACHE_TTL seconds do not list the bucket again
+LISTING_CACHE_TTL = 30
+LISTING_CACHE_SIZE = 16
+_listing_cache: "OrderedDict[Tuple[str, str, str], Tuple[float, list]]" = OrderedDict()
+
+# Values shared by every SearchResult
+SOURCE_LOCAL = 'local'
+SOURCE_S3 = 's3'
+TYPE_FILE = 'file'
+TYPE_FOLDER = 'folder'
+MATCH_NAME = 'name'
+MATCH_CONTENT = 'content'
+MATCH_LIST_ALL = 'list_all'
+
+@dataclass(slots=True)
 class SearchResult:
-    """Data class for search results."""
+    """Data class for search results, slotted to keep large result sets compact."""
     id: str
     name: str
     path: str
     type: str
     match_type: str
     size: Optional[int]
-    modified: str
+    modified: float  # Unix timestamp, formatted as ISO 8601 by to_dict
     parent_path: str
     extension: Optional[str] = None
     preview: Optional[str] = None
     match_count: Optional[int] = None
     permissions: Optional[str] = None
-    source: str = 'local'  # 'local' or 's3'
+    source: str = SOURCE_LOCAL  # SOURCE_LOCAL or SOURCE_S3
     s3_url: Optional[str] = None
     s3_key: Optional[str] = None
+    
+    def modified_iso(self) -> str:
+        """Modification time as ISO 8601: UTC for S3 objects, local time for local files."""
+        if self.source == SOURCE_S3:
+            return datetime.fromtimestamp(self.modified, timezone.utc).isoformat()
+        return datetime.fromtimestamp(self.modified).isoformat()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Flat dict of the fields, much cheaper than dataclasses.asdict's recursive deep copy."""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'path': self.path,
+            'type': self.type,
+            'match_type': self.match_type,
+            'size': self.size,
+            'modified': self.modified_iso(),
+            'parent_path': self.parent_path,
+            'extension': self.extension,
+            'preview': self.preview,
+            'match_count': self.match_count,
+            'permissions': self.permissions,
+            'source': self.source,
+            's3_url': self.s3_url,
+            's3_key': self.s3_key,
+        }
+
+def _extension(name: str) -> str:
+    """Lowercase extension of a file name, '' if none, same rules as os.path.splitext."""
+    dot = name.rfind('.')
+    # Leading dots start a hidden name, not an extension
+    if dot > 0 and (name[0] != '.' or name[:dot].lstrip('.')):
+        return name[dot:].lower()
+    return ''
+
+@lru_cache(maxsize=256)
+def _is_text_extension(ext: str) -> bool:
+    """Whether files with this extension hold text: a known one, or a text/* MIME type."""
+    if ext in TEXT_EXTENSIONS:
+        return True
+    mime_type, _ = mimetypes.guess_type(f"file{ext}")
+    return bool(mime_type and mime_type.startswith('text/'))
+
+def _listing_cache_get(cache_key: Tuple[str, str, str]) -> Optional[list]:
+    """Return the cached listing pages for (endpoint, bucket, prefix) if still fresh."""
+    entry = _listing_cache.get(cache_key)
+    if entry is None:
+        return None
+    stored_at, pages = entry
+    if time.monotonic() - stored_at >= LISTING_CACHE_TTL:
+        del _listing_cache[cache_key]
+        return None
+    _listing_cache.move_to_end(cache_key)
+    return pages
+
+def _listing_cache_put(cache_key: Tuple[str, str, str], pages: list) -> None:
+    """Store listing pages, evicting the least recently used prefixes."""
+    _listing_cache[cache_key] = (time.monotonic(), pages)
+    _listing_cache.move_to_end(cache_key)
+    while len(_listing_cache) > LISTING_CACHE_SIZE:
+        _listing_cache.popitem(last=False)
+
+def invalidate_listing_cache() -> None:
+    """Forget all cached S3 listings, to be called after operations that change the bucket."""
+    _listing_cache.clear()
+
+async def _merge(sources: Iterable, max_active: int):
+    """
+    Yield the items of several async iterators as each produces them, running at most
+    max_active of them at once. An exception raised by any of them is raised here.
+    """
+    pending = iter(sources)
+    queue = asyncio.Queue(maxsize=2 * max_active)
+    tasks = []
+    
+    async def pump(source):
+        try:
+            async with aclosing(source) as items:
+                async for item in items:
+                    await queue.put((False, item))
+        except Exception as e:
+            await queue.put((True, e))
+        else:
+            await queue.put((True, None))
+    
+    def start_next() -> bool:
+        source = next(pending, None)
+        if source is None:
+            return False
+        tasks.append(asyncio.create_task(pump(source)))
+        return True
+    
+    try:
+        active = 0
+        while active < max_active and start_next():
+            active += 1
+        while active:
+            done, value = await queue.get()
+            if not done:
+                yield value
+            elif value is not None:
+                raise value
+            elif not start_next():
+                active -= 1
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def _relevance(result: SearchResult) -> Tuple[bool, float]:
+    """Sort key for search results: name matches first, then the most recently modified."""
+    return result.match_type != MATCH_NAME, -result.modified
+
+def _stable_id(source: str, path: str) -> str:
+    """Result id that stays the same across processes (unlike the randomized hash())."""
+    return f"{source}_{blake2b(path.encode('utf-8'), digest_size=8).hexdigest()}"
+
+class MatchMode(Enum):
+    """How a query matches names, decided once per search instead of per name."""
+    MATCH_ALL = 'match_all'  # '*' or empty query
+    LITERAL = 'literal'      # substring
+    GLOB = 'glob'            # '*' / '?' wildcards
+    REGEX = 'regex'
+
+def _match_mode(query: str, regex_search: bool) -> MatchMode:
+    """Classify a search query."""
+    if query == '*' or query.strip() == '':
+        return MatchMode.MATCH_ALL
+    if regex_search:
+        return MatchMode.REGEX
+    if '*' in query or '?' in query:
+        return MatchMode.GLOB
+    return MatchMode.LITERAL
+
+@lru_cache(maxsize=256)
+def _compile_glob(query: str) -> re.Pattern:
+    """Translate a wildcard query to a compiled regex, cached across searches."""
+    return re.compile(fnmatch.translate(query))
+
+@lru_cache(maxsize=64)
+def _compile_regex(query: str, case_sensitive: bool) -> re.Pattern:
+    """Compile a user regex once per search, raises re.error if it is invalid."""
+    return re.compile(query, 0 if case_sensitive else re.IGNORECASE)
+
+def _match_all(_text: str) -> bool:
+    """Matcher for '*' and empty queries."""
+    return True
+
+def _make_matcher(mode: MatchMode, query: str,
+                  pattern: Optional[re.Pattern]) -> Callable[[str], bool]:
+    """
+    Build the name matcher for a search once, so each name costs a single call.
+    For case-insensitive searches both the query and the names passed to the
+    matcher must already be lowercased: each name is lowercased once by the caller.
+    REGEX mode is the exception, its pattern handles case itself and sees the original name.
+    """
+    if mode is MatchMode.MATCH_ALL:
+        return _match_all
+    if mode is MatchMode.REGEX:
+        return lambda text: pattern.search(text) is not None
+    if mode is MatchMode.LITERAL:
+        return lambda text: query in text
+    
+    wildcard = _compile_glob(query)
+    literals = _wildcard_literals(query)
+    def matches_glob(text: str) -> bool:
+        return all(lit in text for lit in literals) and wildcard.match(text) is not None
+    return matches_glob
+
+def _make_bounds_filter(min_size: Optional[int], max_size: Optional[int],
+                       modified_after: Optional[datetime],
+                       modified_before: Optional[datetime]) -> Optional[Callable[[int, datetime], bool]]:
+    """
+    Build one predicate for the active size and date bounds of a search, so each object
+    costs a single call instead of one pass per filter. Returns None if no bound is set.
+    """
+    if not (min_size or max_size or modified_after or modified_before):
+        return None
+    lowest = min_size or 0
+    highest = max_size or math.inf
+    if not (modified_after or modified_before):
+        return lambda size, _modified: lowest <= size <= highest
+    def in_bounds(size: int, modified: datetime) -> bool:
+        return (lowest <= size <= highest
+                and (not modified_after or modified >= modified_after)
+                and (not modified_before or modified <= modified_before))
+    return in_bounds
+
+def _wildcard_literals(query: str) -> Tuple[str, ...]:
+    """
+    Literal runs that every name matching the wildcard query must contain,
+    e.g. ('foo', 'bar') for '*foo*bar*'. Checking them with 'in' is much cheaper
+    than the regex and rejects most names. Character classes are not parsed,
+    so only the part before the first '[' is used.
+    """
+    return tuple(lit for lit in re.split(r'[*?]+', query.split('[', 1)[0]) if lit)
+
+@lru_cache(maxsize=32)
+def _hyperscan_glob(query: str):
+    """
+    Compile a '*'/'?' wildcard query into a Hyperscan database matching whole lines.
+    Returns None when Hyperscan is not installed or the query uses [...] classes.
+    """
+    if hyperscan is None or '[' in query:
+        return None
+    body = ''.join(
+        '[^\\n]*' if c == '*' else '[^\\n]' if c == '?' else re.escape(c)
+        for c in query
+    )
+    database = hyperscan.Database()
+    database.compile(
+        expressions=[f'^{body}$'.encode('utf-8')],
+        flags=[hyperscan.HS_FLAG_MULTILINE | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_ALLOWEMPTY]
+    )
+    return database
+
+def _hyperscan_matches(database, names: List[str]) -> Optional[Set[int]]:
+    """Indexes of the names matched by a _hyperscan_glob database, scanning them as one buffer."""
+    if not names or any('\n' in name for name in names):
+        return None
+    
+    # Map the end offset of every line to its index; matches are anchored at the line end
+    line_ends = {}
+    offset = -1
+    encoded = []
+    for i, name in enumerate(names):
+        data = name.encode('utf-8')
+        offset += len(data) + 1
+        line_ends[offset] = i
+        encoded.append(data)
+    
+    hits = set()
+    def on_match(_id, _start, end, _flags, _context):
+        hits.add(line_ends[end])
+    
+    database.scan(b'\n'.join(encoded), match_event_handler=on_match)
+    return hits
+
+def _scan_dir(top: str, include_hidden: bool) -> Optional[Tuple[List[os.DirEntry], List[os.DirEntry]]]:
+    """
+    Split one directory into its subdirectory and file DirEntry objects, so their
+    cached type and stat information can be reused instead of stat()ing every path
+    again. Hidden entries are dropped by name before any stat unless include_hidden
+    is set. Symlinks are never walked: a link to a directory is listed with the
+    subdirectories (like os.walk does) and the caller must not descend into it.
+    Returns None for unreadable directories, which are skipped like os.walk does.
+    """
+    dirs, files = [], []
+    try:
+        with os.scandir(top) as it:
+            for entry in it:
+                if not include_hidden and entry.name.startswith('.'):
+                    continue
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if not is_dir and entry.is_symlink():
+                        is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                (dirs if is_dir else files).append(entry)
+    except OSError:
+        return None
+    return dirs, files
+
+def _s3_prefix(search_path: Optional[str]) -> str:
+    """Convert a search path like '/photos' into the S3 key prefix 'photos/'."""
+    prefix = (search_path or '').strip('/')
+    return f"{prefix}/" if prefix else ''
+
+def _clean_preview(preview: str, truncated_start: bool, truncated_end: bool) -> str:
+    """Collapse whitespace in a preview and add ellipsis where it was truncated."""
+    preview = preview.replace('\n', ' ').replace('\r', ' ')
+    preview = ' '.join(preview.split())
+    
+    # Add ellipsis if truncated
+    if truncated_start:
+        preview = '...' + preview
+    if truncated_end:
+        preview = preview + '...'
+    
+    return preview
+
+def _decode_chunks(body) -> Iterator[str]:
+    """Decode a streaming S3 body as UTF-8 chunk by chunk (raises UnicodeDecodeError if it is not)."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for chunk in body.iter_chunks(chunk_size=STREAM_CHUNK_SIZE):
+        yield decoder.decode(chunk)
+    yield decoder.decode(b'', final=True)
+
+def _decode_preview(data: bytes) -> str:
+    """Decode a preview cut out of raw bytes as UTF-8 if possible, else Latin-1 like the full-content search."""
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        pass
+    # Drop multi-byte characters cut in half at either edge of the preview
+    start = 0
+    while start < min(3, len(data)) and 0x80 <= data[start] < 0xC0:
+        start += 1
+    try:
+        return codecs.getincrementaldecoder('utf-8')().decode(data[start:])
+    except UnicodeDecodeError:
+        return data.decode('latin-1')
+
+def _stream_search(chunks: Iterable, query, lower: bool,
+                   context_chars: int = 50) -> Optional[Tuple[int, str]]:
+    """
+    Count the occurrences of query in a stream of chunks and build the preview of the first one.
+    Only the current chunk plus a short tail of the previous one is kept in memory; the tail lets
+    matches that cross a chunk boundary be found, and each match is counted in the buffer where it ends.
+    For bytes the preview window is widened to fit context_chars UTF-8 characters (up to 4 bytes each,
+    plus a character cut at the edge) and trimmed to context_chars characters once decoded.
+    """
+    qlen = len(query)
+    context = context_chars * 4 + 3 if isinstance(query, bytes) else context_chars
+    keep = qlen - 1 + context
+    self_overlapping = any(query[:k] == query[-k:] for k in range(1, qlen))
+    tail = None
+    buf_offset = 0        # stream position of buf[0]
+    last_end = 0          # stream position where the last counted match ends
+    count = 0
+    preview = None        # text around the first match
+    preview_start = 0
+    match_at = 0          # position of the first match in preview
+    after_needed = 0      # context still missing after the first match
+    
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if preview is not None and after_needed:
+            preview += chunk[:after_needed]
+            after_needed -= len(chunk[:after_needed])
+        
+        buf = chunk if tail is None else tail + chunk
+        hay = buf.lower() if lower else buf
+        tail_len = len(buf) - len(chunk)
+        start = max(last_end - buf_offset, tail_len - qlen + 1, 0)
+        
+        n = hay.count(query, start)
+        if n:
+            if preview is None:
+                idx = hay.find(query, start)
+                match_at = min(idx, context)
+                preview_start = buf_offset + idx - match_at
+                end = idx + qlen + context
+                preview = buf[idx - match_at:end]
+                after_needed = max(0, end - len(buf))
+            count += n
+            if self_overlapping:
+                # count() skips overlapping occurrences, follow the same chain to its last match
+                pos = hay.find(query, start)
+                for _ in range(n - 1):
+                    pos = hay.find(query, pos + qlen)
+            else:
+                pos = hay.rfind(query, start)
+            last_end = buf_offset + pos + qlen
+        
+        tail = buf[-keep:] if keep else buf[:0]
+        buf_offset += len(buf) - len(tail)
+    
+    if not count:
+        return None
+    
+    total = buf_offset + (len(tail) if tail is not None else 0)
+    truncated_start = preview_start > 0
+    truncated_end = preview_start + len(preview) < total
+    if isinstance(preview, bytes):
+        before = _decode_preview(preview[:match_at])
+        after = _decode_preview(preview[match_at + qlen:])
+        truncated_start = truncated_start or len(before) > context_chars
+        truncated_end = truncated_end or len(after) > context_chars
+        preview = (before[max(0, len(before) - context_chars):]
+                   + preview[match_at:match_at + qlen].decode('ascii') + after[:context_chars])
+    return count, _clean_preview(preview, truncated_start, truncated_end)
 
 class S3SearchManager:
     """Handles S3 file searching and operations."""
     
-    def __init__(self, s3_config: Dict[str, str]):
+    def __init__(self, s3_config: Dict[str, str], executor: Optional[ThreadPoolExecutor] = None):
         self.s3_config = s3_config
         self.s3_client = None
+        self.executor = executor or ThreadPoolExecutor(max_workers=4)
         self._initialize_s3_client()
     
     def _initialize_s3_client(self):
@@ -96,6 +517,13 @@ class S3SearchManager:
                 endpoint_url = f"https://{s3_host}"
                 use_ssl = True
             
+            # Reuse the client already built for this endpoint and credentials
+            bucket = self.s3_config['S3_BUCKET_DATA']
+            cache_key = (endpoint_url, self.s3_config['S3_ACCESS_KEY'], self.s3_config['S3_SECRET_KEY'], bucket)
+            if cache_key in _S3_CLIENTS:
+                self.s3_client = _S3_CLIENTS[cache_key]
+                return
+            
             logger.info(f"Initializing S3 client with endpoint: {endpoint_url}")
             
             self.s3_client = boto3.client(
@@ -104,13 +532,14 @@ class S3SearchManager:
                 aws_access_key_id=self.s3_config['S3_ACCESS_KEY'],
                 aws_secret_access_key=self.s3_config['S3_SECRET_KEY'],
                 use_ssl=use_ssl if 'use_ssl' in locals() else True,
-                verify=False  # For self-signed certificates
+                verify=False,  # For self-signed certificates
+                config=S3_CLIENT_CONFIG
             )
             
             # Test connection
-            bucket = self.s3_config['S3_BUCKET_DATA']
             self.s3_client.head_bucket(Bucket=bucket)
             logger.info(f"S3 client initialized successfully for bucket: {bucket}")
+            _S3_CLIENTS[cache_key] = self.s3_client
             
         except ClientError as e:
             error_code = e.response['Error']['Code']
@@ -125,81 +554,172 @@ class S3SearchManager:
             logger.error(f"Failed to initialize S3 client: {str(e)}")
             self.s3_client = None
     
-    async def list_all_s3_objects(self) -> List[SearchResult]:
-        """List ALL objects in S3 bucket - no limits, no filters."""
+    async def _iter_pages(self, bucket: str, prefix: str, **list_args):
+        """Yield ListObjectsV2 pages, fetching the next page while the caller processes the current one."""
+        loop = asyncio.get_running_loop()
+        params = {'Bucket': bucket, 'Prefix': prefix, 'MaxKeys': S3_PAGE_SIZE, 'FetchOwner': False, **list_args}
+        
+        def fetch(token: Optional[str]):
+            if token:
+                return self.s3_client.list_objects_v2(ContinuationToken=token, **params)
+            return self.s3_client.list_objects_v2(**params)
+        
+        pending = loop.run_in_executor(self.executor, fetch, None)
+        while pending is not None:
+            page = await pending
+            # Each request needs the previous token, so at most one page can be read ahead
+            token = page.get('NextContinuationToken') if page.get('IsTruncated') else None
+            pending = loop.run_in_executor(self.executor, fetch, token) if token else None
+            yield page
+    
+    async def _iter_listing(self, bucket: str, prefix: str):
+        """
+        Yield the ListObjectsV2 pages of every key under prefix. A prefix that does not fit
+        in one page is split by its subfolders into up to S3_LISTING_SHARDS key ranges that
+        are listed concurrently, so after the first page keys come in no particular order.
+        """
+        loop = asyncio.get_running_loop()
+        first_page = await loop.run_in_executor(self.executor, partial(
+            self.s3_client.list_objects_v2, Bucket=bucket, Prefix=prefix, MaxKeys=S3_PAGE_SIZE, FetchOwner=False
+        ))
+        yield first_page
+        if not first_page.get('IsTruncated'):
+            return
+        
+        # A delimited listing of the rest returns the keys directly under the prefix and names the subfolders
+        after = first_page['Contents'][-1]['Key']
+        folders = []
+        async with aclosing(self._iter_pages(bucket, prefix, Delimiter='/', StartAfter=after)) as pages:
+            async for page in pages:
+                folders.extend(common['Prefix'] for common in page.get('CommonPrefixes', []))
+                if page.get('Contents'):
+                    yield page
+        
+        # The subfolder the first page stopped in may not be named, its remaining keys come first
+        depth = len(prefix)
+        slash = after.find('/', depth)
+        if slash != -1 and after[:slash + 1] not in folders[:1]:
+            folders.insert(0, after[:slash + 1])
+        if not folders:
+            return
+        
+        # Contiguous runs of subfolders, each listed from its first subfolder up to the next run
+        step = -(-len(folders) // S3_LISTING_SHARDS)
+        starts = folders[::step]
+        ranges = (
+            self._iter_key_range(bucket, prefix, start, end, after)
+            for start, end in zip(starts, starts[1:] + [None])
+        )
+        async with aclosing(_merge(ranges, S3_LISTING_SHARDS)) as pages:
+            async for page in pages:
+                yield page
+    
+    async def _iter_key_range(self, bucket: str, prefix: str, start: str, end: Optional[str], after: str):
+        """
+        Yield the pages of the keys under prefix that are inside a subfolder and sort from
+        start (a subfolder, included) to end (excluded, None for no limit), after 'after'.
+        """
+        depth = len(prefix)
+        async with aclosing(self._iter_pages(bucket, prefix, StartAfter=max(after, start[:-1]))) as pages:
+            async for page in pages:
+                contents = page.get('Contents', [])
+                # Keys directly under the prefix come from the delimited listing
+                in_range = [
+                    obj for obj in contents
+                    if start <= obj['Key'] and (end is None or obj['Key'] < end) and '/' in obj['Key'][depth:]
+                ]
+                if in_range:
+                    yield {'Contents': in_range}
+                if end is not None and contents and contents[-1]['Key'] >= end:
+                    return
+    
+    async def _iter_objects(self, bucket: str, prefix: str):
+        """Yield each listing page as (key, size, last_modified) tuples, from the listing cache when fresh."""
+        cache_key = (self.s3_client.meta.endpoint_url, bucket, prefix)
+        cached = _listing_cache_get(cache_key)
+        if cached is not None:
+            logger.info(f"Using cached listing for bucket '{bucket}' prefix '{prefix}'")
+            for objects in cached:
+                yield objects
+            return
+        
+        pages = []
+        async with aclosing(self._iter_listing(bucket, prefix)) as listing:
+            async for page in listing:
+                objects = [(obj['Key'], obj['Size'], obj['LastModified']) for obj in page.get('Contents', [])]
+                pages.append(objects)
+                yield objects
+        
+        # Only complete listings are cached
+        _listing_cache_put(cache_key, pages)
+    
+    async def list_all_s3_objects(self, search_path: str = '/') -> List[SearchResult]:
+        """List ALL objects in S3 bucket under search_path - no limits, no filters."""
+        async with aclosing(self.iter_all_s3_objects(search_path)) as pages:
+            return [result async for page in pages for result in page]
+    
+    async def iter_all_s3_objects(self, search_path: str = '/'):
+        """Yield the objects under search_path as lists of results, one per listing page."""
         if not self.s3_client:
             logger.warning("S3 client not available, skipping S3 listing")
-            return []
+            return
         
         try:
             bucket = self.s3_config['S3_BUCKET_DATA']
-            results = []
+            prefix = _s3_prefix(search_path)
+            found = 0
             objects_scanned = 0
             
-            logger.info(f"Starting COMPLETE S3 bucket scan: '{bucket}'")
+            logger.info(f"Starting COMPLETE S3 bucket scan: '{bucket}' prefix '{prefix}'")
             
-            # Use paginator to scan ENTIRE bucket - no MaxKeys limit
-            paginator = self.s3_client.get_paginator('list_objects_v2')
-            page_iterator = paginator.paginate(Bucket=bucket)
-            
-            for page_num, page in enumerate(page_iterator, 1):
-                if 'Contents' not in page:
-                    logger.info(f"Page {page_num}: No objects found")
-                    continue
+            # Scan ENTIRE prefix - no MaxKeys limit
+            page_num = 0
+            async with aclosing(self._iter_objects(bucket, prefix)) as listing:
+                async for objects in listing:
+                    page_num += 1
+                    if not objects:
+                        logger.info(f"Page {page_num}: No objects found")
+                        continue
                 
-                page_objects = len(page['Contents'])
-                logger.info(f"Page {page_num}: Processing {page_objects} objects")
+                    logger.info(f"Page {page_num}: Processing {len(objects)} objects")
                 
-                for obj in page['Contents']:
-                    objects_scanned += 1
+                    results = []
+                    for key, size, modified in objects:
+                        objects_scanned += 1
                     
-                    # Extract object info
-                    key = obj['Key']
-                    name = os.path.basename(key) or key
-                    size = obj['Size']
-                    modified = obj['LastModified']
+                        # Extract object info
+                        name = key[key.rfind('/') + 1:] or key
                     
-                    # Skip directories (keys ending with /) but include everything else
-                    if key.endswith('/') and size == 0:
-                        continue
+                        # Skip directories (keys ending with /) but include everything else
+                        if key.endswith('/') and size == 0:
+                            continue
                     
-                    result = SearchResult(
-                        id=f"s3_{abs(hash(key))}",
-                        name=name,
-                        path=f"/{key}",
-                        type='file',
-                        match_type='list_all',
-                        size=size,
-                        modified=modified.isoformat(),
-                        parent_path=f"/{os.path.dirname(key)}" if os.path.dirname(key) else '/',
-                        extension=os.path.splitext(name)[1].lower() if '.' in name else None,
-                        source='s3',
-                        s3_url=f"s3://{bucket}/{key}",
-                        s3_key=key
-                    )
+                        result = self._make_result(bucket, key, name, size, modified, MATCH_LIST_ALL)
                     
-                    results.append(result)
+                        results.append(result)
                     
-                    # Progress logging for large buckets
-                    if objects_scanned % 1000 == 0:
-                        logger.info(f"Processed {objects_scanned} objects so far...")
+                        # Progress logging for large buckets
+                        if objects_scanned % 1000 == 0:
+                            logger.info(f"Processed {objects_scanned} objects so far...")
+                
+                    if results:
+                        found += len(results)
+                        yield results
             
-            logger.info(f"COMPLETE S3 scan finished: found {len(results)} files from {objects_scanned} total objects")
-            return results
+            logger.info(f"COMPLETE S3 scan finished: found {found} files from {objects_scanned} total objects")
             
         except ClientError as e:
             error_code = e.response.get('Error', {}).get('Code', 'Unknown')
             logger.error(f"S3 complete listing error ({error_code}): {str(e)}")
-            return []
         except Exception as e:
             logger.error(f"Unexpected S3 complete listing error: {str(e)}")
             import traceback
             logger.error(traceback.format_exc())
-            return []
 
     async def search_s3_objects(
         self,
         query: str,
+        search_path: str = '/',
         search_type: str = 'name',
         case_sensitive: bool = False,
         max_results: int = None,  # REMOVED LIMIT - can be None for unlimited
@@ -212,178 +732,266 @@ class S3SearchManager:
         modified_before: Optional[datetime] = None
     ) -> List[SearchResult]:
         """Search S3 objects based on criteria - UNLIMITED RESULTS."""
+        pages = self.iter_s3_results(
+            query, search_path, search_type, case_sensitive, file_extensions, regex_search,
+            include_preview, min_size, max_size, modified_after, modified_before
+        )
+        async with aclosing(pages):
+            return [result async for page in pages for result in page]
+    
+    async def iter_s3_results(
+        self,
+        query: str,
+        search_path: str = '/',
+        search_type: str = 'name',
+        case_sensitive: bool = False,
+        file_extensions: List[str] = None,
+        regex_search: bool = False,
+        include_preview: bool = False,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        modified_after: Optional[datetime] = None,
+        modified_before: Optional[datetime] = None,
+        pattern: Optional[re.Pattern] = None
+    ):
+        """Yield the matching S3 objects as lists of results, one per listing page with matches."""
         if not self.s3_client:
             logger.warning("S3 client not available, skipping S3 search")
-            return []
+            return
         
         # Special case: if query is '*' or empty, list all files
         if query == '*' or query.strip() == '':
             logger.info("Wildcard or empty query detected - listing ALL files")
-            return await self.list_all_s3_objects()
+            async with aclosing(self.iter_all_s3_objects(search_path)) as pages:
+                async for results in pages:
+                    yield results
+            return
         
+        # Assigned before the try, the finally block stops whatever was started
+        workers = []
+        page_iterator = None
         try:
             bucket = self.s3_config['S3_BUCKET_DATA']
-            results = []
+            prefix = _s3_prefix(search_path)
+            found = 0
             objects_scanned = 0
             
-            logger.info(f"Starting S3 search in bucket '{bucket}' for query '{query}' (unlimited results)")
+            logger.info(f"Starting S3 search in bucket '{bucket}' prefix '{prefix}' for query '{query}' (unlimited results)")
             
-            # List all objects in bucket - NO LIMITS
-            paginator = self.s3_client.get_paginator('list_objects_v2')
-            page_iterator = paginator.paginate(Bucket=bucket)
+            # List all objects under the prefix - NO LIMITS, filtering by prefix is done server-side
+            page_iterator = self._iter_objects(bucket, prefix)
             
+            mode = _match_mode(query, regex_search)
+            # Names are lowercased for case-insensitive matching, except for a regex compiled with IGNORECASE
+            fold = not case_sensitive and mode is not MatchMode.REGEX
             search_query = query if case_sensitive else query.lower()
+            hs_database = _hyperscan_glob(search_query) if mode is MatchMode.GLOB else None
             
-            # Compile regex if needed
-            pattern = None
-            if regex_search:
+            # Compile regex if the caller did not already
+            if regex_search and pattern is None:
                 try:
-                    pattern = re.compile(query, re.IGNORECASE if not case_sensitive else 0)
+                    pattern = _compile_regex(query, case_sensitive)
                 except re.error as e:
                     logger.error(f"Invalid regex pattern: {str(e)}")
-                    return results
+                    return
+            
+            matches = _make_matcher(mode, search_query, pattern)
+            in_bounds = _make_bounds_filter(min_size, max_size, modified_after, modified_before)
             
-            for page in page_iterator:
-                if 'Contents' not in page:
+            # Content searches run on S3_MAX_CONCURRENCY workers fed through a bounded queue,
+            # so listing keeps going while the GetObject calls of earlier pages are in flight
+            if search_type in ['content', 'both']:
+                candidates = asyncio.Queue(maxsize=CONTENT_QUEUE_SIZE)
+                content_results = asyncio.Queue()
+                workers = [
+                    asyncio.create_task(self._content_worker(
+                        candidates, content_results, bucket, search_query, pattern, case_sensitive
+                    ))
+                    for _ in range(S3_MAX_CONCURRENCY)
+                ]
+            
+            async for objects in page_iterator:
+                if not objects:
                     logger.info("No objects found in S3 bucket")
                     continue
                 
-                for obj in page['Contents']:
-                    objects_scanned += 1
-                    
-                    # REMOVED: if len(results) >= max_results: break
-                    # Now we process ALL objects regardless of current result count
+                objects_scanned += len(objects)
+                
+                # REMOVED: if len(results) >= max_results: break
+                # Now we process ALL objects regardless of current result count
+                
+                entries = []
+                # Names as compared with the query, lowercased once per object
+                search_names = []
+                for key, size, modified in objects:
+                    # Apply the size and date filters first, they only compare listing fields
+                    if in_bounds and not in_bounds(size, modified):
+                        continue
                     
                     # Extract object info
-                    key = obj['Key']
-                    name = os.path.basename(key) or key
-                    size = obj['Size']
-                    modified = obj['LastModified']
+                    name = key[key.rfind('/') + 1:] or key
                     
                     # Skip directories (keys ending with /)
                     if key.endswith('/') and size == 0:
                         continue
                     
-                    # Apply size filters
-                    if min_size and size < min_size:
-                        continue
-                    if max_size and size > max_size:
-                        continue
-                    
-                    # Apply date filters
-                    if modified_after and modified < modified_after:
-                        continue
-                    if modified_before and modified > modified_before:
-                        continue
+                    search_name = name.lower() if fold else name
                     
                     # Apply extension filter
                     if file_extensions:
-                        ext = os.path.splitext(name)[1].lower()
-                        if ext not in file_extensions:
+                        if _extension(search_name) not in file_extensions:
                             continue
                     
+                    entries.append((key, name, size, modified))
+                    search_names.append(search_name)
+                
+                # Match the wildcard against all the page's names in one Hyperscan scan, if available
+                name_hits = None
+                if hs_database is not None and search_type in ['name', 'both']:
+                    name_hits = _hyperscan_matches(hs_database, search_names)
+                
+                results = []
+                for i, (key, name, size, modified) in enumerate(entries):
                     # Check name match
                     name_matched = False
                     if search_type in ['name', 'both']:
-                        if self._matches_s3(name, search_query, pattern, case_sensitive):
+                        if name_hits is not None:
+                            name_matched = i in name_hits
+                        elif matches(search_names[i]):
                             name_matched = True
                     
-                    # Check content match if needed
-                    content_matched = False
-                    match_info = None
-                    if search_type in ['content', 'both'] and not name_matched:
-                        if await self._should_search_s3_content(key, size):
-                            match_info = await self._search_s3_content(
-                                bucket, key, search_query, pattern, case_sensitive
-                            )
-                            if match_info:
-                                content_matched = True
-                    
-                    # Create result if matched
-                    if name_matched or content_matched:
-                        match_type = 'name' if name_matched else 'content'
-                        
-                        result = SearchResult(
-                            id=f"s3_{abs(hash(key))}",
-                            name=name,
-                            path=f"/{key}",
-                            type='file',
-                            match_type=match_type,
-                            size=size,
-                            modified=modified.isoformat(),
-                            parent_path=f"/{os.path.dirname(key)}" if os.path.dirname(key) else '/',
-                            extension=os.path.splitext(name)[1].lower() if '.' in name else None,
-                            source='s3',
-                            s3_url=f"s3://{bucket}/{key}",
-                            s3_key=key
-                        )
-                        
-                        # Add match info if available
-                        if match_info:
-                            result.match_count, result.preview = match_info
-                        elif include_preview and name_matched:
-                            # Get preview for name matches
-                            result.preview = await self._get_s3_preview(bucket, key)
-                        
+                    # Create result for name matches
+                    if name_matched:
+                        result = self._make_result(bucket, key, name, size, modified, MATCH_NAME)
                         results.append(result)
+                    
+                    # Otherwise queue the object for content search if needed
+                    elif workers:
+                        if self._should_search_s3_content(key, size):
+                            await candidates.put((key, name, size, modified))
+                
+                # Get the previews of the page's name matches concurrently, bounded by the executor size
+                if include_preview and results:
+                    loop = asyncio.get_running_loop()
+                    previews = await asyncio.gather(*[
+                        loop.run_in_executor(self.executor, self._get_s3_preview, bucket, result.s3_key)
+                        for result in results
+                    ])
+                    for result, preview in zip(results, previews):
+                        result.preview = preview
+                
+                # Pick up the content matches completed so far
+                if workers:
+                    while not content_results.empty():
+                        results.append(content_results.get_nowait())
                 
                 # REMOVED: if len(results) >= max_results: break
                 # Now we scan ALL pages regardless of result count
+                if results:
+                    found += len(results)
+                    yield results
                 
                 # Progress logging
                 if objects_scanned % 1000 == 0:
-                    logger.info(f"Scanned {objects_scanned} objects, found {len(results)} matches so far...")
+                    logger.info(f"Scanned {objects_scanned} objects, found {found} matches so far...")
+            
+            # Listing is done: stop the workers once the queue drains and collect their last matches
+            if workers:
+                for _ in workers:
+                    await candidates.put(None)
+                running = len(workers)
+                while running:
+                    batch = [await content_results.get()]
+                    while not content_results.empty():
+                        batch.append(content_results.get_nowait())
+                    results = [result for result in batch if result is not None]
+                    running -= len(batch) - len(results)
+                    if results:
+                        found += len(results)
+                        yield results
             
-            logger.info(f"S3 search complete: scanned {objects_scanned} objects, found {len(results)} matches (unlimited)")
-            return results
+            logger.info(f"S3 search complete: scanned {objects_scanned} objects, found {found} matches (unlimited)")
             
         except ClientError as e:
             error_code = e.response.get('Error', {}).get('Code', 'Unknown')
             logger.error(f"S3 search error ({error_code}): {str(e)}")
-            return []
         except Exception as e:
             logger.error(f"Unexpected S3 search error: {str(e)}")
             import traceback
             logger.error(traceback.format_exc())
-            return []
+        finally:
+            # Nothing is left running if the search fails or the caller stops early
+            for worker in workers:
+                worker.cancel()
+            if page_iterator is not None:
+                await page_iterator.aclose()
     
-    def _matches_s3(self, text: str, query: str, pattern: Optional[re.Pattern], 
-                    case_sensitive: bool) -> bool:
-        """Check if S3 object name matches the search criteria."""
-        # Special case: if query is '*', match everything
-        if query == '*':
-            return True
-            
-        if pattern:
-            return bool(pattern.search(text))
-        
-        search_text = text if case_sensitive else text.lower()
-        
-        # Support wildcards
-        if '*' in query or '?' in query:
-            return fnmatch.fnmatch(search_text, query)
-        
-        return query in search_text
     
-    async def _should_search_s3_content(self, key: str, size: int) -> bool:
+    def _should_search_s3_content(self, key: str, size: int) -> bool:
         """Determine if S3 object content should be searched."""
         # Check file size
         if size > MAX_CONTENT_SIZE:
             return False
         
-        # Check if it's a known text file
-        ext = os.path.splitext(key)[1].lower()
-        if ext in TEXT_EXTENSIONS:
-            return True
-        
-        # Check MIME type
-        mime_type, _ = mimetypes.guess_type(key)
-        if mime_type and mime_type.startswith('text/'):
-            return True
-        
-        return False
+        # Check the extension of the name (a leading dot starts a hidden name, not an extension)
+        name_start = key.rfind('/') + 1
+        dot = key.rfind('.', name_start + 1)
+        return dot != -1 and _is_text_extension(key[dot:].lower())
+    
+    def _make_result(self, bucket: str, key: str, name: str, size: int,
+                     modified: datetime, match_type: str) -> SearchResult:
+        """Build the search result for an S3 object."""
+        slash = key.rfind('/')
+        return SearchResult(
+            id=_stable_id(SOURCE_S3, key),
+            name=name,
+            path=f"/{key}",
+            type=TYPE_FILE,
+            match_type=match_type,
+            size=size,
+            modified=modified.timestamp(),
+            parent_path=f"/{key[:slash]}" if slash > 0 else '/',
+            extension=_extension(name) or None,
+            source=SOURCE_S3,
+            s3_url=f"s3://{bucket}/{key}",
+            s3_key=key
+        )
+    
+    async def _content_worker(
+        self,
+        candidates: asyncio.Queue,
+        content_results: asyncio.Queue,
+        bucket: str,
+        query: str,
+        pattern: Optional[re.Pattern],
+        case_sensitive: bool
+    ):
+        """
+        Search the content of queued objects in the executor until a None arrives, then put a None.
+        A failing object is logged and skipped, so the queue keeps draining, and the None is put
+        however the worker ends, so the search never waits on a worker that is gone.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                candidate = await candidates.get()
+                if candidate is None:
+                    break
+                key, name, size, modified = candidate
+                try:
+                    match_info = await loop.run_in_executor(
+                        self.executor, self._search_s3_content, bucket, key, query, pattern, case_sensitive
+                    )
+                    if match_info:
+                        result = self._make_result(bucket, key, name, size, modified, MATCH_CONTENT)
+                        result.match_count, result.preview = match_info
+                        content_results.put_nowait(result)
+                except Exception as e:
+                    logger.warning(f"Content search failed for {key}: {str(e)}")
+        finally:
+            content_results.put_nowait(None)
     
-    async def _search_s3_content(
+    def _search_s3_content(
         self,
         bucket: str,
         key: str,
@@ -391,11 +999,29 @@ class S3SearchManager:
         pattern: Optional[re.Pattern],
         case_sensitive: bool
     ) -> Optional[Tuple[int, str]]:
-        """Search S3 object content."""
+        """Search S3 object content (blocking, runs in the executor)."""
         try:
-            # Download object content
             response = self.s3_client.get_object(Bucket=bucket, Key=key)
-            content_bytes = response['Body'].read()
+            body = response['Body']
+            
+            # ASCII queries are searched on the raw bytes: no decoding, and bytes.lower()
+            # only folds ASCII letters, which is all an ASCII query can match
+            if not pattern and query.isascii():
+                return _stream_search(
+                    body.iter_chunks(chunk_size=STREAM_CHUNK_SIZE), query.encode('ascii'), not case_sensitive
+                )
+            
+            # Plain text queries are searched while streaming, so only one chunk is held in memory
+            if not pattern:
+                try:
+                    return _stream_search(_decode_chunks(body), query, not case_sensitive)
+                except UnicodeDecodeError:
+                    # Not UTF-8: fetch it again and try the other encodings below
+                    body.close()
+                    body = self.s3_client.get_object(Bucket=bucket, Key=key)['Body']
+            
+            # Download object content
+            content_bytes = body.read()
             
             # Try to decode content
             content = None
@@ -432,8 +1058,8 @@ class S3SearchManager:
             logger.debug(f"Error searching S3 content {key}: {str(e)}")
             return None
     
-    async def _get_s3_preview(self, bucket: str, key: str, max_chars: int = 200) -> Optional[str]:
-        """Get a preview of S3 object content."""
+    def _get_s3_preview(self, bucket: str, key: str, max_chars: int = 200) -> Optional[str]:
+        """Get a preview of S3 object content (blocking, runs in the executor)."""
         try:
             # Get partial content for preview
             response = self.s3_client.get_object(
@@ -468,27 +1094,16 @@ class S3SearchManager:
         start = max(0, match_pos - context_chars)
         end = min(len(content), match_pos + match_len + context_chars)
         
-        preview = content[start:end]
-        
-        # Clean up preview
-        preview = preview.replace('\n', ' ').replace('\r', ' ')
-        preview = ' '.join(preview.split())
-        
-        # Add ellipsis if truncated
-        if start > 0:
-            preview = '...' + preview
-        if end < len(content):
-            preview = preview + '...'
-        
-        return preview
+        return _clean_preview(content[start:end], start > 0, end < len(content))
 
 class FileSearcher:
     """Enhanced file searcher with local and S3 support."""
     
-    def __init__(self, base_directory: str, s3_config: Dict[str, str], max_workers: int = 4):
+    def __init__(self, base_directory: str, s3_config: Dict[str, str], max_workers: int = S3_MAX_CONCURRENCY):
         self.base_path = Path(base_directory).resolve()
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
-        self.s3_manager = S3SearchManager(s3_config)
+        self.max_workers = max_workers
+        self.executor = _get_executor(max_workers)
+        self.s3_manager = S3SearchManager(s3_config, self.executor)
         
     async def search(
         self,
@@ -511,6 +1126,69 @@ class FileSearcher:
         """
         Perform enhanced file search with local and S3 support - UNLIMITED RESULTS.
         """
+        all_results = []
+        source_counts = {'local': 0, 's3': 0}
+        limit = max_results if max_results and max_results > 0 else None
+        
+        # Every source is still read to the end: the best results by relevance can come last,
+        # and the counts cover all matches. With a limit the buffer is pruned to the best
+        # 'limit' whenever it doubles, so memory stays O(limit) and the cost O(N log limit).
+        async with aclosing(self._iter_results(
+            query, search_path, search_type, include_folders, case_sensitive, file_extensions, regex_search,
+            include_hidden, min_size, max_size, modified_after, modified_before, include_preview, search_sources
+        )) as batches:
+            async for source, results in batches:
+                source_counts[source] += len(results)
+                all_results.extend(results)
+                if limit and len(all_results) > 2 * limit:
+                    all_results = heapq.nsmallest(limit, all_results, key=_relevance)
+        
+        # Every local result counts as a scanned entry
+        total_scanned = source_counts['local']
+        
+        # Sort results by relevance (name matches first, then by modified date)
+        all_results.sort(key=_relevance)
+        if limit:
+            all_results = all_results[:limit]
+        all_results = [r.to_dict() for r in all_results]
+        
+        logger.info(f"Search complete: {len(all_results)} total results returned (was limited: {max_results is not None})")
+        
+        return all_results, total_scanned, source_counts
+    
+    async def stream_search(self, max_results: int = None, **search_args):
+        """
+        Yield result dicts in batches as they are found, instead of collecting them all first.
+        Takes the same arguments as search(), but results come in discovery order, not sorted.
+        """
+        remaining = max_results if max_results and max_results > 0 else None
+        async with aclosing(self._iter_results(**search_args)) as batches:
+            async for _, results in batches:
+                if remaining is not None:
+                    results = results[:remaining]
+                    remaining -= len(results)
+                yield [r.to_dict() for r in results]
+                if remaining == 0:
+                    break
+    
+    async def _iter_results(
+        self,
+        query: str = '*',
+        search_path: str = '/',
+        search_type: str = 'name',
+        include_folders: bool = True,
+        case_sensitive: bool = False,
+        file_extensions: List[str] = None,
+        regex_search: bool = False,
+        include_hidden: bool = False,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        modified_after: Optional[str] = None,
+        modified_before: Optional[str] = None,
+        include_preview: bool = False,
+        search_sources: List[str] = None
+    ):
+        """Yield (source, results) batches: up to S3_PAGE_SIZE local results, or one S3 listing page."""
         # Default to searching both sources
         if not search_sources:
             search_sources = ['local', 's3']
@@ -524,90 +1202,107 @@ class FileSearcher:
             file_extensions = {ext if ext.startswith('.') else f'.{ext}' 
                              for ext in file_extensions}
         
-        all_results = []
-        total_scanned = 0
-        source_counts = {'local': 0, 's3': 0}
-        
-        # Search local files
-        if 'local' in search_sources:
+        # Compile the regex once, both sources share the same pattern object
+        pattern = None
+        if regex_search and _match_mode(query, regex_search) is MatchMode.REGEX:
             try:
-                local_results, local_scanned = await self._search_local(
-                    query=query,
-                    search_path=search_path,
-                    search_type=search_type,
-                    include_folders=include_folders,
-                    case_sensitive=case_sensitive,
-                    max_results=None,  # No limit for local search
-                    file_extensions=file_extensions,
-                    regex_search=regex_search,
-                    include_hidden=include_hidden,
-                    min_size=min_size,
-                    max_size=max_size,
-                    modified_after_dt=modified_after_dt,
-                    modified_before_dt=modified_before_dt,
-                    include_preview=include_preview
-                )
-                all_results.extend([asdict(r) for r in local_results])
-                total_scanned += local_scanned
-                source_counts['local'] = len(local_results)
-            except Exception as e:
-                logger.error(f"Local search error: {str(e)}")
+                pattern = _compile_regex(query, case_sensitive)
+            except re.error as e:
+                logger.error(f"Invalid regex pattern: {str(e)}")
+                return
         
-        # Search S3 objects - NO RESULT LIMIT
+        # Local and S3 are searched concurrently, batches are yielded as either source produces them
+        sources = []
+        if 'local' in search_sources:
+            sources.append(self._iter_local_batches(
+                query=query,
+                search_path=search_path,
+                search_type=search_type,
+                include_folders=include_folders,
+                case_sensitive=case_sensitive,
+                file_extensions=file_extensions,
+                regex_search=regex_search,
+                include_hidden=include_hidden,
+                min_size=min_size,
+                max_size=max_size,
+                modified_after_dt=modified_after_dt,
+                modified_before_dt=modified_before_dt,
+                include_preview=include_preview,
+                pattern=pattern
+            ))
         if 's3' in search_sources:
-            try:
-                s3_results = await self.s3_manager.search_s3_objects(
-                    query=query,
-                    search_type=search_type,
-                    case_sensitive=case_sensitive,
-                    max_results=None,  # UNLIMITED S3 RESULTS
-                    file_extensions=file_extensions,
-                    regex_search=regex_search,
-                    include_preview=include_preview,
-                    min_size=min_size,
-                    max_size=max_size,
-                    modified_after=modified_after_dt,
-                    modified_before=modified_before_dt
-                )
-                all_results.extend([asdict(r) for r in s3_results])
-                source_counts['s3'] = len(s3_results)
-            except Exception as e:
-                logger.error(f"S3 search error: {str(e)}")
-        
-        # Sort results by relevance (name matches first, then by modified date)
-        all_results.sort(key=lambda x: (
-            0 if x['match_type'] == 'name' else 1,
-            -datetime.fromisoformat(x['modified']).timestamp()
-        ))
-        
-        # Apply max_results limit only if specified
-        if max_results and max_results > 0:
-            all_results = all_results[:max_results]
+            sources.append(self._iter_s3_batches(
+                query=query,
+                search_path=search_path,
+                search_type=search_type,
+                case_sensitive=case_sensitive,
+                file_extensions=file_extensions,
+                regex_search=regex_search,
+                include_preview=include_preview,
+                min_size=min_size,
+                max_size=max_size,
+                modified_after=modified_after_dt,
+                modified_before=modified_before_dt,
+                pattern=pattern
+            ))
         
-        logger.info(f"Search complete: {len(all_results)} total results returned (was limited: {max_results is not None})")
-        
-        return all_results, total_scanned, source_counts
+        async with aclosing(_merge(sources, len(sources))) as batches:
+            async for batch in batches:
+                yield batch
+    
+    async def _iter_local_batches(self, **kwargs):
+        """Yield (SOURCE_LOCAL, results) batches of up to S3_PAGE_SIZE local results."""
+        try:
+            batch = []
+            async with aclosing(self._iter_local(**kwargs)) as local_results:
+                async for result in local_results:
+                    batch.append(result)
+                    if len(batch) >= S3_PAGE_SIZE:
+                        yield SOURCE_LOCAL, batch
+                        batch = []
+            if batch:
+                yield SOURCE_LOCAL, batch
+        except Exception as e:
+            logger.error(f"Local search error: {str(e)}")
+    
+    async def _iter_s3_batches(self, **kwargs):
+        """Yield (SOURCE_S3, results) batches, one per S3 listing page with matches."""
+        try:
+            async with aclosing(self.s3_manager.iter_s3_results(**kwargs)) as pages:
+                async for results in pages:
+                    yield SOURCE_S3, results
+        except Exception as e:
+            logger.error(f"S3 search error: {str(e)}")
     
-    def _parse_date(self, date_str: str) -> Optional[datetime]:
-        """Parse date string to datetime object."""
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _parse_date(date_str: str) -> Optional[datetime]:
+        """Parse date string to datetime object, dates without a timezone are taken as UTC."""
         if not date_str:
             return None
         
         try:
-            # Try different date formats
-            for fmt in ['%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S']:
+            # ISO 8601 covers the common forms and is much faster than strptime
+            parsed = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+        except ValueError:
+            parsed = None
+            # Fall back to the looser formats accepted by strptime (e.g. '2024-1-5')
+            for fmt in DATE_FORMATS:
                 try:
-                    return datetime.strptime(date_str, fmt)
+                    parsed = datetime.strptime(date_str, fmt)
+                    break
                 except ValueError:
                     continue
-            
-            # If none work, try ISO format
-            return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        except Exception as e:
-            logger.warning(f"Could not parse date '{date_str}': {e}")
-            return None
+            if parsed is None:
+                logger.warning(f"Could not parse date '{date_str}'")
+                return None
+        
+        # S3 LastModified is timezone-aware, naive datetimes cannot be compared with it
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed
 
-    async def _search_local(self, **kwargs):
+    async def _iter_local(self, **kwargs):
         """Search local files - UNLIMITED RESULTS."""
         # Validate and resolve search path
         search_path_obj = self.base_path / kwargs['search_path'].lstrip('/')
@@ -621,32 +1316,39 @@ class FileSearcher:
             # Create directory if it doesn't exist
             search_path_resolved.mkdir(parents=True, exist_ok=True)
         
-        # Compile regex if needed
-        pattern = None
-        if kwargs['regex_search']:
-            try:
-                pattern = re.compile(kwargs['query'], 
-                                   re.IGNORECASE if not kwargs['case_sensitive'] else 0)
-            except re.error as e:
-                raise ValueError(f"Invalid regex pattern: {str(e)}")
-        
-        # Perform search
-        results = []
-        total_scanned = 0
-        
         # Use async generator for better memory efficiency
-        async for result in self._search_local_generator(
-            search_path=search_path_resolved,
-            pattern=pattern,
-            **kwargs
-        ):
-            results.append(result)
-            total_scanned += 1
-            
-            # REMOVED: if len(results) >= kwargs['max_results']: break
-            # Now processes ALL local files
+        async with aclosing(self._search_local_generator(
+            **{**kwargs, 'search_path': search_path_resolved}
+        )) as local_results:
+            async for result in local_results:
+                yield result
+    
+    async def _walk_local(self, top: str, include_hidden: bool):
+        """
+        Walk a directory tree like os.walk, scanning up to max_workers directories
+        at once on the executor. Directories are yielded as their scans complete,
+        so the order is not deterministic.
+        """
+        loop = asyncio.get_running_loop()
+        pending = {loop.run_in_executor(self.executor, _scan_dir, top, include_hidden): top}
+        queued = []
         
-        return results, total_scanned
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                root = pending.pop(future)
+                scanned = future.result()
+                if scanned is None:
+                    continue
+                dirs, files = scanned
+                
+                # Links to directories are reported but not followed
+                queued.extend(entry.path for entry in dirs if not entry.is_symlink())
+                while queued and len(pending) < self.max_workers:
+                    path = queued.pop()
+                    pending[loop.run_in_executor(self.executor, _scan_dir, path, include_hidden)] = path
+                
+                yield root, dirs, files
     
     async def _search_local_generator(self, **kwargs):
         """Async generator for local search results - UNLIMITED."""
@@ -661,96 +1363,94 @@ class FileSearcher:
         include_hidden = kwargs['include_hidden']
         include_preview = kwargs['include_preview']
         
+        mode = _match_mode(query, kwargs['regex_search'])
+        # Names are lowercased for case-insensitive matching, except for a regex compiled with IGNORECASE
+        fold = not case_sensitive and mode is not MatchMode.REGEX
         search_query = query if case_sensitive else query.lower()
+        matches = _make_matcher(mode, search_query, pattern)
         
-        # Walk directory tree
-        for root, dirs, files in os.walk(search_path):
-            # Filter hidden directories if needed
-            if not include_hidden:
-                dirs[:] = [d for d in dirs if not d.startswith('.')]
-            
-            # Process ALL files and directories found
-            root_path = Path(root)
-            
-            # Process directories if requested
-            if include_folders:
-                for dir_name in dirs:
-                    if self._matches_local(dir_name, search_query, pattern, case_sensitive):
-                        dir_path = root_path / dir_name
-                        relative_path = dir_path.relative_to(kwargs['search_path'])
+        # Walk directory tree, hidden entries are already skipped unless requested
+        async with aclosing(self._walk_local(str(search_path), include_hidden)) as walk:
+            async for root, dirs, files in walk:
+                # Process ALL files and directories found
+                root_path = Path(root)
+            
+                # Process directories if requested
+                if include_folders:
+                    for dir_entry in dirs:
+                        dir_name = dir_entry.name
+                        if matches(dir_name.lower() if fold else dir_name):
+                            dir_path = root_path / dir_name
+                            relative_path = dir_path.relative_to(kwargs['search_path'])
                         
-                        yield SearchResult(
-                            id=f"local_{abs(hash(str(dir_path)))}",
-                            name=dir_name,
-                            path=f"/{relative_path}",
-                            type='folder',
-                            match_type='name',
-                            size=None,
-                            modified=datetime.fromtimestamp(dir_path.stat().st_mtime).isoformat(),
-                            parent_path=f"/{relative_path.parent}" if relative_path.parent != Path('.') else '/',
-                            source='local'
-                        )
-            
-            # Process files
-            for file_name in files:
-                if not include_hidden and file_name.startswith('.'):
-                    continue
-                
-                file_path = root_path / file_name
-                
-                # Apply extension filter
-                if file_extensions:
+                            yield SearchResult(
+                                id=_stable_id(SOURCE_LOCAL, str(dir_path)),
+                                name=dir_name,
+                                path=f"/{relative_path}",
+                                type=TYPE_FOLDER,
+                                match_type=MATCH_NAME,
+                                size=None,
+                                modified=dir_entry.stat(follow_symlinks=False).st_mtime,
+                                parent_path=f"/{relative_path.parent}" if relative_path.parent != Path('.') else '/',
+                                source=SOURCE_LOCAL
+                            )
+            
+                # Process files
+                for file_entry in files:
+                    file_name = file_entry.name
+                    file_path = root_path / file_name
                     ext = file_path.suffix.lower()
-                    if ext not in file_extensions:
+                
+                    # Apply extension filter
+                    if file_extensions and ext not in file_extensions:
                         continue
                 
-                # Check if file matches
-                name_matched = False
-                if search_type in ['name', 'both']:
-                    if self._matches_local(file_name, search_query, pattern, case_sensitive):
-                        name_matched = True
+                    # Check if file matches
+                    name_matched = False
+                    if search_type in ['name', 'both']:
+                        if matches(file_name.lower() if fold else file_name):
+                            name_matched = True
                 
-                # For wildcard or empty queries, include all files
-                if query == '*' or query.strip() == '':
-                    name_matched = True
+                    # For wildcard or empty queries, include all files
+                    if mode is MatchMode.MATCH_ALL:
+                        name_matched = True
                 
-                if name_matched:
-                    try:
-                        stat = file_path.stat()
-                        relative_path = file_path.relative_to(kwargs['search_path'])
+                    if name_matched:
+                        try:
+                            stat = file_entry.stat(follow_symlinks=False)
+                            relative_path = file_path.relative_to(kwargs['search_path'])
                         
-                        yield SearchResult(
-                            id=f"local_{abs(hash(str(file_path)))}",
-                            name=file_name,
-                            path=f"/{relative_path}",
-                            type='file',
-                            match_type='name' if name_matched else 'content',
-                            size=stat.st_size,
-                            modified=datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                            parent_path=f"/{relative_path.parent}" if relative_path.parent != Path('.') else '/',
-                            extension=file_path.suffix.lower() if file_path.suffix else None,
-                            source='local'
-                        )
-                    except Exception as e:
-                        logger.warning(f"Error processing file {file_path}: {e}")
-                        continue
+                            yield SearchResult(
+                                id=_stable_id(SOURCE_LOCAL, str(file_path)),
+                                name=file_name,
+                                path=f"/{relative_path}",
+                                type=TYPE_FILE,
+                                match_type=MATCH_NAME if name_matched else MATCH_CONTENT,
+                                size=stat.st_size,
+                                modified=stat.st_mtime,
+                                parent_path=f"/{relative_path.parent}" if relative_path.parent != Path('.') else '/',
+                                extension=ext or None,
+                                source=SOURCE_LOCAL
+                            )
+                        except Exception as e:
+                            logger.warning(f"Error processing file {file_path}: {e}")
+                            continue
     
-    def _matches_local(self, text: str, query: str, pattern: Optional[re.Pattern], case_sensitive: bool) -> bool:
-        """Check if local file/folder name matches the search criteria."""
-        # Special case: if query is '*', match everything
-        if query == '*' or query.strip() == '':
-            return True
-            
-        if pattern:
-            return bool(pattern.search(text))
-        
-        search_text = text if case_sensitive else text.lower()
-        
-        # Support wildcards
-        if '*' in query or '?' in query:
-            return fnmatch.fnmatch(search_text, query)
-        
-        return query in search_text
+
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Event loop reused by every invocation of a warm container, created on first use and never closed."""
+    global _LOOP
+    if _LOOP is None or _LOOP.is_closed():
+        _LOOP = asyncio.new_event_loop()
+    asyncio.set_event_loop(_LOOP)
+    return _LOOP
+
+@lru_cache(maxsize=None)
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Thread pool shared by every searcher of a warm container, like the event loop it is never shut down."""
+    return ThreadPoolExecutor(max_workers=max_workers)
 
 # Main function
 def main(args: Dict[str, Any]) -> Dict[str, Any]:
@@ -780,32 +1480,26 @@ def main(args: Dict[str, Any]) -> Dict[str, Any]:
         base_directory = args.get('base_directory', '/tmp/filemanager')
         searcher = FileSearcher(base_directory, s3_config)
         
-        # Run search asynchronously
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            results, total_scanned, source_counts = loop.run_until_complete(
-                searcher.search(
-                    query=query,
-                    search_path=search_path,
-                    search_type=search_type,
-                    max_results=max_results,
-                    search_sources=search_sources,
-                    include_folders=args.get('include_folders', True),
-                    case_sensitive=args.get('case_sensitive', False),
-                    file_extensions=args.get('file_extensions'),
-                    regex_search=args.get('regex_search', False),
-                    include_hidden=args.get('include_hidden', False),
-                    min_size=args.get('min_size'),
-                    max_size=args.get('max_size'),
-                    modified_after=args.get('modified_after'),
-                    modified_before=args.get('modified_before'),
-                    include_preview=args.get('include_preview', False)
-                )
+        # Run search asynchronously on the container's long-lived event loop
+        results, total_scanned, source_counts = _get_loop().run_until_complete(
+            searcher.search(
+                query=query,
+                search_path=search_path,
+                search_type=search_type,
+                max_results=max_results,
+                search_sources=search_sources,
+                include_folders=args.get('include_folders', True),
+                case_sensitive=args.get('case_sensitive', False),
+                file_extensions=args.get('file_extensions'),
+                regex_search=args.get('regex_search', False),
+                include_hidden=args.get('include_hidden', False),
+                min_size=args.get('min_size'),
+                max_size=args.get('max_size'),
+                modified_after=args.get('modified_after'),
+                modified_before=args.get('modified_before'),
+                include_preview=args.get('include_preview', False)
             )
-        finally:
-            loop.close()
+        )
         
         # Format results for chat interface
         total_results = len(results)
@@ -846,14 +1540,11 @@ def main(args: Dict[str, Any]) -> Dict[str, Any]:
             ]
             
             # Add file type breakdown
-            file_types = {}
-            for result in results:
-                ext = result.get('extension', '') or 'no extension'
-                file_types[ext] = file_types.get(ext, 0) + 1
+            file_types = Counter(result.get('extension') or 'no extension' for result in results)
             
             if len(file_types) > 1:
-                response['file_types'] = file_types
-                top_types = sorted(file_types.items(), key=lambda x: x[1], reverse=True)[:5]
+                response['file_types'] = dict(file_types)
+                top_types = file_types.most_common(5)
                 response['top_file_types'] = top_types
         else:
             response['options'] = [
@@ -865,7 +1556,7 @@ def main(args: Dict[str, Any]) -> Dict[str, Any]:
         
         # Add recent files (last 10)
         if results:
-            recent_files = sorted(results, key=lambda x: x['modified'], reverse=True)[:10]
+            recent_files = heapq.nlargest(10, results, key=itemgetter('modified'))
             response['recent_files'] = recent_files
         
         logger.info(f"Search completed: {total_results} results returned")
@@ -898,14 +1589,16 @@ async def list_all_files(args: Dict[str, Any]) -> Dict[str, Any]:
         }
         
         s3_manager = S3SearchManager(s3_config)
-        all_files = await s3_manager.list_all_s3_objects()
+        # Convert each listing page as it arrives, without an intermediate list of SearchResult
+        async with aclosing(s3_manager.iter_all_s3_objects(args.get('search_path', '/'))) as pages:
+            results = [file.to_dict() async for page in pages for file in page]
         
         return {
             'success': True,
-            'results': [asdict(file) for file in all_files],
-            'total_found': len(all_files),
-            'message': f'Listed all {len(all_files)} files in bucket',
-            'options': ['Download file', 'Filter files', 'Search files'] if all_files else ['Upload files']
+            'results': results,
+            'total_found': len(results),
+            'message': f'Listed all {len(results)} files in bucket',
+            'options': ['Download file', 'Filter files', 'Search files'] if results else ['Upload files']
         }
         
     except Exception as e:
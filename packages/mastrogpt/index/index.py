@@ -1,19 +1,50 @@
-import os, json, requests
+import os, json, time, requests
 from pathlib import Path
+from functools import lru_cache
 from urllib.parse import urlparse, urlunparse
 
+# one session per container, so warm invocations reuse the connection to the apihost
+_session = None
+
+def get_session():
+  global _session
+  if _session is None:
+    _session = requests.Session()
+    _session.headers.update({"Accept": "application/json"})
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    _session.mount("https://", adapter)
+    _session.mount("http://", adapter)
+  return _session
+
 def invoke(cmd, data=None):
   apihost = os.getenv("__OW_API_HOST") or os.getenv("OPSDEV_APIHOST")
   [user, pasw] = (os.getenv("__OW_API_KEY") or os.getenv("AUTH")).split(":")
   auth = requests.auth.HTTPBasicAuth(user, pasw)
   url = f"{apihost}/api/v1/namespaces/_/{cmd}"
   #print(url)
+  session = get_session()
   if data:
-    res = requests.post(url, auth=auth, json=data).json()
+    res = session.post(url, auth=auth, json=data).json()
   else:
-    res = requests.get(url, auth=auth).json()
+    res = session.get(url, auth=auth).json()
   return res
 
+# the action list changes rarely, keep it for a while per apihost and key
+ACTIONS_TTL = 30
+_actions_cache = {}
+
+def list_actions():
+  key = (os.getenv("__OW_API_HOST") or os.getenv("OPSDEV_APIHOST"), os.getenv("__OW_API_KEY") or os.getenv("AUTH"))
+  now = time.monotonic()
+  cached = _actions_cache.get(key)
+  if cached and now - cached[0] < ACTIONS_TTL:
+    return cached[1]
+  actions = invoke("actions")
+  # do not cache errors
+  if isinstance(actions, list):
+    _actions_cache[key] = (now, actions)
+  return actions
+
 def get_indexes(actions):
   out = []
   for ent in actions:
@@ -46,45 +77,54 @@ def get_services(indexes):
 
     if not key in smap: smap[key] = []
     smap[key].append(item)
-    # final result
-    res = []
-    keys = list(smap.keys())
-    keys.sort()
-    for k in keys:
-      key =k.split(":", maxsplit=1)[-1]
-      res.append({key: smap[k]})
+  # final result, built once sorted by weight and folder
+  res = []
+  for k, items in sorted(smap.items()):
+    key = k.split(":", maxsplit=1)[-1]
+    res.append({key: items})
   return res
 
 # support for legacy file based menus
-def legacy(services):
+# the json files ship with the action, so they are read once per container
+def load_legacy():
   current_dir = os.path.dirname(os.path.abspath(__file__))
   files = os.listdir(current_dir)
   files.sort()
+  menus = []
   for file in files:
-    # file = files[1]
     if not file.endswith(".json"):
       continue
-    #print(file)
     entry = file.rsplit(".", maxsplit=1)[0].split("-", maxsplit=1)[-1]
-    dict = json.loads(Path(os.path.join(current_dir, file)).read_text())
+    items = json.loads(Path(os.path.join(current_dir, file)).read_text())
+    for item in items:
+      item["iframe"] = ""
+    menus.append((entry, items))
+  return menus
+
+LEGACY_MENUS = load_legacy()
+
+def legacy(services):
+  for entry, items in LEGACY_MENUS:
     for service in services:
-      # service = services[2]
-      #print(service)
       if entry in service:
-        for key in dict:
-          key["iframe"] = ""
-          service[entry].append(key)
-        dict = None
+        service[entry].extend(items)
         break
-    if dict:
-      for key in dict:
-        key["iframe"] = ""
-      services.append({entry: dict})
+    else:
+      if items:
+        services.append({entry: list(items)})
   return services  
       
+# the apihost is fixed in a container, derive its s3 and stream hosts once
+@lru_cache(maxsize=8)
+def derived_hosts(apihost):
+  url = urlparse(apihost)
+  s3_host = urlunparse(url._replace(netloc="s3."+url.netloc))
+  stream_host = urlunparse(url._replace(netloc="stream."+url.netloc))
+  return s3_host, stream_host
+
 def main(args):
 
-  actions = invoke("actions")
+  actions = list_actions()
   indexes = get_indexes(actions)
   services = get_services(indexes)
   services = legacy(services)
@@ -93,9 +133,7 @@ def main(args):
   host = args.get("OPSDEV_HOST", os.getenv("OPSDEV_HOST", ""))
   apihost = args.get("OPSDEV_APIHOST", os.getenv("OPSDEV_APIHOST", ""))
   
-  url = urlparse(apihost)
-  s3_host = urlunparse(url._replace(netloc="s3."+url.netloc))
-  stream_host = urlunparse(url._replace(netloc="stream."+url.netloc))
+  s3_host, stream_host = derived_hosts(apihost)
 
   res = {
     "username": username,
@@ -2,6 +2,7 @@ import os, json
 import bcrypt, secrets, redis
 from pathlib import Path
 import traceback
+from functools import lru_cache
 
 def verify_password(password: str, hashed_password: str) -> bool:
     """
@@ -16,12 +17,20 @@ def verify_password(password: str, hashed_password: str) -> bool:
     """
     return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
 
+@lru_cache(maxsize=4)
+def get_redis(url: str) -> redis.Redis:
+    """
+    Return the redis client for the url, created once per container.
+    The client owns a connection pool, so warm invocations reuse its sockets.
+    """
+    return redis.from_url(url, max_connections=16)
+
 def generate_and_save_token(args) -> str:
     """
     Generate a token for the user and save it in redis.
     """
     username = args.get("username")
-    rd = redis.from_url(args.get("REDIS_URL", os.getenv("REDIS_URL")))
+    rd = get_redis(args.get("REDIS_URL", os.getenv("REDIS_URL")))
     prefix = args.get("REDIS_PREFIX", os.getenv("REDIS_PREFIX"))
  
     key = secrets.token_urlsafe(32)
@@ -0,0 +1,26 @@
+import json
+import importlib.util
+from datetime import datetime
+
+spec = importlib.util.spec_from_file_location("filemanager", "packages/mastrogpt/filemanager/__main__.py")
+filemanager = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(filemanager)
+
+def check_response(res):
+    assert res["headers"] == {"Content-Type": "application/json"}
+    assert isinstance(res["body"], str)
+    return json.loads(res["body"])
+
+def test_main_body_with_and_without_orjson(monkeypatch):
+    result = {"success": True, "when": datetime(2024, 1, 2, 3, 4, 5), "name": "café"}
+    monkeypatch.setattr(filemanager, "process_request", lambda args: result)
+    expected = {"success": True, "when": "2024-01-02 03:04:05", "name": "café"}
+    if filemanager.orjson:
+        assert check_response(filemanager.main({})) == expected
+    monkeypatch.setattr(filemanager, "orjson", None)
+    assert check_response(filemanager.main({})) == expected
+
+def test_main_body_when_orjson_cannot_encode(monkeypatch):
+    # orjson only encodes 64-bit integers, json has no such limit
+    monkeypatch.setattr(filemanager, "process_request", lambda args: {"size": 2 ** 70})
+    assert check_response(filemanager.main({})) == {"size": 2 ** 70}
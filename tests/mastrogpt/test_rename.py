@@ -0,0 +1,111 @@
+import sys
+sys.path.append("packages/mastrogpt/filemanager")
+import rename
+from botocore.exceptions import ClientError
+
+def test_is_valid_filename():
+    assert rename.is_valid_filename("report-2024.pdf")
+    assert rename.is_valid_filename("  spaced name.txt ")
+    assert not rename.is_valid_filename("")
+    assert not rename.is_valid_filename("..")
+    assert not rename.is_valid_filename("a/b.txt")
+    assert not rename.is_valid_filename("a\\b.txt")
+    assert not rename.is_valid_filename("what?.txt")
+    assert not rename.is_valid_filename("tab\there")
+    assert not rename.is_valid_filename("x" * 256)
+
+class FakeS3:
+    """
+    In-memory stand-in for the few S3 calls rename_many makes. head_object sees the
+    bucket as it was before any copy, like parallel copies all checking at once.
+    """
+    def __init__(self, keys, fail_copy_to=(), changed_after_head=()):
+        self.objects = dict.fromkeys(keys, b"data")
+        self.initial = set(self.objects)
+        self.fail_copy_to = set(fail_copy_to)
+        self.changed_after_head = set(changed_after_head)
+        self.etags = dict.fromkeys(keys, '"v1"')
+        self.copies = 0
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.initial:
+            raise KeyError(Key)
+        etag = self.etags[Key]
+        if Key in self.changed_after_head:
+            # A concurrent writer replaces the object right after this HEAD
+            self.etags[Key] = '"v2"'
+        return {"ETag": etag}
+
+    def copy_object(self, CopySource, Bucket, Key, MetadataDirective, CopySourceIfMatch=None):
+        if Key in self.fail_copy_to:
+            raise IOError(f"copy to {Key} failed")
+        if CopySourceIfMatch and CopySourceIfMatch != self.etags[CopySource['Key']]:
+            raise ClientError({"Error": {"Code": "PreconditionFailed"}}, "CopyObject")
+        self.copies += 1
+        self.objects[Key] = self.objects[CopySource['Key']]
+
+    def delete_objects(self, Bucket, Delete):
+        for obj in Delete['Objects']:
+            self.objects.pop(obj['Key'], None)
+        return {}
+
+def rename_many(monkeypatch, client, renames):
+    monkeypatch.setattr(rename, "s3client", lambda args: (client, "data"))
+    return rename.rename_many({"renames": renames})
+
+def test_rename_many(monkeypatch):
+    client = FakeS3(["d/a.txt", "d/b.txt"])
+    res = rename_many(monkeypatch, client, [{"old_path": "/d/a.txt", "new_name": "c.txt"},
+                                            {"old_path": "/d/b.txt", "new_name": "d.txt"}])
+    assert res["success"]
+    assert sorted(client.objects) == ["d/c.txt", "d/d.txt"]
+
+def test_rename_many_rejects_conflicting_targets(monkeypatch):
+    client = FakeS3(["d/a.txt", "d/b.txt"])
+    res = rename_many(monkeypatch, client, [{"old_path": "/d/a.txt", "new_name": "same.txt"},
+                                            {"old_path": "/d/b.txt", "new_name": "same.txt"}])
+    assert not res["success"] and "same.txt" in res["error"]
+    res = rename_many(monkeypatch, client, [{"old_path": "/d/b.txt", "new_name": "c.txt"},
+                                            {"old_path": "/d/c.txt", "new_name": "b.txt"}])
+    assert not res["success"] and "c.txt" in res["error"]
+    assert client.copies == 0
+    assert sorted(client.objects) == ["d/a.txt", "d/b.txt"]
+
+def test_rename_many_rolls_back_failed_copies(monkeypatch):
+    client = FakeS3(["d/a.txt", "d/b.txt"], fail_copy_to=["d/y.txt"])
+    res = rename_many(monkeypatch, client, [{"old_path": "/d/a.txt", "new_name": "x.txt"},
+                                            {"old_path": "/d/b.txt", "new_name": "y.txt"}])
+    assert not res["success"]
+    assert res["failed"][0]["old_path"] == "/d/b.txt"
+    assert sorted(client.objects) == ["d/a.txt", "d/b.txt"]
+
+def test_rename_many_detects_changed_source(monkeypatch):
+    client = FakeS3(["d/a.txt", "d/b.txt"], changed_after_head=["d/b.txt"])
+    res = rename_many(monkeypatch, client, [{"old_path": "/d/a.txt", "new_name": "x.txt"},
+                                            {"old_path": "/d/b.txt", "new_name": "y.txt"}])
+    assert not res["success"]
+    assert res["failed"] == [{"old_path": "/d/b.txt", "error": "Source changed during rename: d/b.txt"}]
+    assert sorted(client.objects) == ["d/a.txt", "d/b.txt"]
+
+def test_delete_keys_batches():
+    client = FakeS3([f"k{i}" for i in range(2500)])
+    calls = []
+    delete_objects = client.delete_objects
+    client.delete_objects = lambda **kw: calls.append(len(kw["Delete"]["Objects"])) or delete_objects(**kw)
+    assert rename.delete_keys(client, "data", list(client.objects)) == []
+    assert calls == [1000, 1000, 500]
+    assert client.objects == {}
+
+def test_s3client_reads_environment_lazily(monkeypatch):
+    monkeypatch.setenv("S3_ACCESS_KEY", "key")
+    monkeypatch.setenv("S3_SECRET_KEY", "secret")
+    monkeypatch.setenv("S3_BUCKET_DATA", "first")
+    rename._env.cache_clear()
+    try:
+        assert rename.s3client({"S3_HOST": "localhost", "S3_PORT": "9000"})[1] == "first"
+        monkeypatch.setenv("S3_BUCKET_DATA", "second")
+        assert rename.s3client({"S3_HOST": "localhost", "S3_PORT": "9000"})[1] == "first"
+        rename._env.cache_clear()
+        assert rename.s3client({"S3_HOST": "localhost", "S3_PORT": "9000"})[1] == "second"
+    finally:
+        rename._env.cache_clear()
@@ -0,0 +1,264 @@
+import os
+import sys
+import asyncio
+import pytest
+from datetime import datetime, timezone
+from itertools import count
+from types import SimpleNamespace
+sys.path.append("packages/mastrogpt/filemanager")
+import search
+
+MODIFIED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+# Unique endpoints keep each fake bucket's listings apart in the listing cache
+ENDPOINTS = count()
+
+class FakeBody:
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+    def iter_chunks(self, chunk_size):
+        for i in range(0, len(self.data), chunk_size):
+            yield self.data[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+class FakeS3:
+    """
+    In-memory stand-in for the S3 calls of the searcher. ListObjectsV2 follows S3:
+    keys in order, Prefix, StartAfter, Delimiter rolling keys up into CommonPrefixes
+    (each counting towards MaxKeys) and continuation tokens. With named_start_folder
+    False, the folder holding StartAfter is not returned as a common prefix.
+    """
+    def __init__(self, objects, named_start_folder=True):
+        self.objects = objects
+        self.named_start_folder = named_start_folder
+        self.list_calls = 0
+        self.meta = SimpleNamespace(endpoint_url=f"fake://{next(ENDPOINTS)}")
+
+    def list_objects_v2(self, Bucket, Prefix='', MaxKeys=1000, FetchOwner=False,
+                        Delimiter=None, StartAfter='', ContinuationToken=None):
+        self.list_calls += 1
+        kind, last = (ContinuationToken[0], ContinuationToken[1:]) if ContinuationToken else ('K', '')
+        entries = []
+        for key in sorted(self.objects):
+            if not key.startswith(Prefix) or key <= StartAfter or key <= last:
+                continue
+            if kind == 'P' and key.startswith(last):
+                continue
+            cut = key.find(Delimiter, len(Prefix)) if Delimiter else -1
+            if cut == -1:
+                entries.append(('K', key))
+                continue
+            common = key[:cut + 1]
+            if not self.named_start_folder and StartAfter.startswith(common):
+                continue
+            if entries[-1:] != [('P', common)]:
+                entries.append(('P', common))
+        page = entries[:MaxKeys]
+        response = {'IsTruncated': len(entries) > MaxKeys}
+        contents = [{'Key': k, 'Size': len(self.objects[k]), 'LastModified': MODIFIED} for t, k in page if t == 'K']
+        if contents:
+            response['Contents'] = contents
+        if Delimiter:
+            response['CommonPrefixes'] = [{'Prefix': k} for t, k in page if t == 'P']
+        if response['IsTruncated']:
+            response['NextContinuationToken'] = ''.join(page[-1])
+        return response
+
+    def get_object(self, Bucket, Key, Range=None):
+        data = self.objects[Key]
+        if Range:
+            data = data[:int(Range.rsplit('-', 1)[1]) + 1]
+        return {'Body': FakeBody(data)}
+
+def s3_manager(objects, **kwargs):
+    manager = search.S3SearchManager({'S3_BUCKET_DATA': 'data'})
+    manager.s3_client = FakeS3(objects, **kwargs)
+    return manager
+
+def local_search(base, **kwargs):
+    searcher = search.FileSearcher(str(base), {})
+    results, _, _ = asyncio.run(searcher.search(search_sources=['local'], **kwargs))
+    return sorted(r['path'] for r in results)
+
+def test_local_search(tmp_path):
+    (tmp_path / "docs" / "old").mkdir(parents=True)
+    (tmp_path / ".hidden").mkdir()
+    (tmp_path / "docs" / "readme.md").write_text("hello")
+    (tmp_path / "docs" / "old" / "notes.txt").write_text("world")
+    (tmp_path / ".hidden" / "secret.txt").write_text("x")
+
+    assert local_search(tmp_path) == ["/docs", "/docs/old", "/docs/old/notes.txt", "/docs/readme.md"]
+    assert local_search(tmp_path, query="*.txt") == ["/docs/old/notes.txt"]
+    assert local_search(tmp_path, query="README") == ["/docs/readme.md"]
+    assert local_search(tmp_path, query="README", case_sensitive=True) == []
+    assert local_search(tmp_path, query="notes", case_sensitive=True) == ["/docs/old/notes.txt"]
+    assert local_search(tmp_path, query="*.txt", include_hidden=True) == ["/.hidden/secret.txt", "/docs/old/notes.txt"]
+
+def test_search_max_results_larger_than_batch(tmp_path, monkeypatch):
+    for i in range(15):
+        path = tmp_path / f"f{i:02}.txt"
+        path.write_text("x")
+        os.utime(path, (1_000_000 + i * 37 % 15, 1_000_000 + i * 37 % 15))
+    monkeypatch.setattr(search, "S3_PAGE_SIZE", 2)
+    searcher = search.FileSearcher(str(tmp_path), {})
+    ranked, _, _ = asyncio.run(searcher.search(search_sources=['local']))
+    for limit in [1, 3, 5, 14, 15, 20]:
+        results, _, counts = asyncio.run(searcher.search(search_sources=['local'], max_results=limit))
+        assert [r['path'] for r in results] == [r['path'] for r in ranked[:limit]]
+        assert counts['local'] == 15
+
+def test_local_search_symlinks(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "inner.txt").write_text("x")
+    (tmp_path / "file.txt").write_text("x")
+    (tmp_path / "link").symlink_to("sub", target_is_directory=True)
+    (tmp_path / "flink.txt").symlink_to("file.txt")
+
+    searcher = search.FileSearcher(str(tmp_path), {})
+    results, _, _ = asyncio.run(searcher.search(search_sources=['local']))
+    # Links to directories are folders, but their contents are only found through the real path
+    assert sorted((r['path'], r['type']) for r in results) == [
+        ("/file.txt", "file"), ("/flink.txt", "file"), ("/link", "folder"), ("/sub", "folder"), ("/sub/inner.txt", "file")
+    ]
+
+def test_searchers_share_executor(tmp_path):
+    first = search.FileSearcher(str(tmp_path), {})
+    second = search.FileSearcher(str(tmp_path), {})
+    assert first.executor is second.executor
+    asyncio.run(first.search(search_sources=['local']))
+    assert not first.executor._shutdown
+
+def test_regex_matches_original_names(tmp_path):
+    names = ["Report.txt", "report.txt", "İzmir.txt"]
+    for name in names:
+        (tmp_path / name).write_text("x")
+    manager = s3_manager(dict.fromkeys(names, b"x"))
+    cases = [
+        ("(?-i:R)eport", False, ["/Report.txt"]),
+        ("REPORT", False, ["/Report.txt", "/report.txt"]),
+        ("^R", True, ["/Report.txt"]),
+        (r"^\w+\.txt$", False, ["/Report.txt", "/report.txt", "/İzmir.txt"]),
+    ]
+    for query, case_sensitive, expected in cases:
+        assert local_search(tmp_path, query=query, regex_search=True, case_sensitive=case_sensitive) == expected
+        found = asyncio.run(manager.search_s3_objects(query, regex_search=True, case_sensitive=case_sensitive))
+        assert sorted(r.path for r in found) == expected
+
+def test_s3_invalid_regex():
+    manager = s3_manager({"a.txt": b"x"})
+    assert asyncio.run(manager.search_s3_objects("[abc", regex_search=True)) == []
+    assert asyncio.run(manager.search_s3_objects("*.txt", regex_search=True)) == []
+    assert [r.path for r in asyncio.run(manager.search_s3_objects("^a", regex_search=True))] == ["/a.txt"]
+
+def listed_keys(manager, prefix):
+    async def collect():
+        return [key async for page in manager._iter_objects("data", prefix) for key, _, _ in page]
+    search.invalidate_listing_cache()
+    return asyncio.run(collect())
+
+# Folder names sorting around 'a/' ('-' and '.' sort before '/', '0' after), empty folder names
+# and keys directly under the prefix between the folders
+TRICKY_KEYS = sorted(
+    {f"{top}/{sub}/f{i}.txt" for top in ["a", "a-2", "a.b", "a0", "b", ""] for sub in ["x", "x.y", ""] for i in range(70)}
+    | {f"{top}/f{i}" for top in ["a", "a-2", "a.b", "docs"] for i in range(40)}
+    | {"a", "a.txt", "a-2", "a0.txt", "b.txt", "docs/", "a/", "z"}
+)
+
+@pytest.mark.parametrize("page_size", [1000, 7])
+@pytest.mark.parametrize("named_start_folder", [True, False])
+def test_s3_listing_lists_each_key_once(monkeypatch, page_size, named_start_folder):
+    monkeypatch.setattr(search, "S3_PAGE_SIZE", page_size)
+    manager = s3_manager(dict.fromkeys(TRICKY_KEYS, b""), named_start_folder=named_start_folder)
+    assert len(TRICKY_KEYS) > 1000
+    for prefix in ["", "a", "a/", "a/x/", "nothing/"]:
+        keys = listed_keys(manager, prefix)
+        assert sorted(keys) == [k for k in TRICKY_KEYS if k.startswith(prefix)]
+
+def test_s3_listing_cache(monkeypatch):
+    manager = s3_manager({"d/a.txt": b"", "d/b.txt": b""})
+    search.invalidate_listing_cache()
+    search_all = lambda: sorted(r.path for r in asyncio.run(manager.search_s3_objects("*.txt")))
+    assert search_all() == ["/d/a.txt", "/d/b.txt"]
+    calls = manager.s3_client.list_calls
+    manager.s3_client.objects["d/c.txt"] = b""
+    assert search_all() == ["/d/a.txt", "/d/b.txt"]
+    assert manager.s3_client.list_calls == calls
+    search.invalidate_listing_cache()
+    assert search_all() == ["/d/a.txt", "/d/b.txt", "/d/c.txt"]
+    monkeypatch.setattr(search, "LISTING_CACHE_TTL", 0)
+    manager.s3_client.objects.pop("d/a.txt")
+    assert search_all() == ["/d/b.txt", "/d/c.txt"]
+
+def test_stream_search_matches_full_content_search():
+    manager = s3_manager({})
+    content = "BAR " * 20 + "café Hello\nWorld hello, naïve € 😀 hello again " + "x" * 60 + " heLLo"
+    for query, lower in [("hello", True), ("Hello", False), ("llo", True), ("naïve", True), ("héllo", True)]:
+        text = content.lower() if lower else content
+        expected = (text.count(query), manager._extract_preview(content, text.find(query), len(query))) \
+            if query in text else None
+        data = content.encode()
+        # Every chunk boundary, as text and as raw bytes for ASCII queries
+        for cut in range(1, len(data)):
+            chunks = [data[:cut], data[cut:]]
+            if query.isascii():
+                assert search._stream_search(chunks, query.encode(), lower) == expected
+            text_chunks = [content[:cut], content[cut:]]
+            assert search._stream_search(text_chunks, query, lower) == expected
+    assert search._stream_search([b"abc", b"def"], b"xyz", True) is None
+
+def test_s3_content_search():
+    content = "BAR " * 20 + "naïve café, déjà vu, Ελληνικά Hello world"
+    manager = s3_manager({"a.txt": content.encode(), "b.md": b"nothing here", "c.jpg": b"hello"})
+    results = asyncio.run(manager.search_s3_objects("hello", search_type="content"))
+    assert [(r.path, r.match_count, r.preview) for r in results] == [
+        ("/a.txt", 1, manager._extract_preview(content, content.find("Hello"), 5))
+    ]
+    assert results[0].preview.startswith("...BAR BAR BAR")
+
+def test_stream_search(tmp_path):
+    (tmp_path / "local.txt").write_text("x")
+    searcher = search.FileSearcher(str(tmp_path), {})
+    searcher.s3_manager.s3_config = {'S3_BUCKET_DATA': 'data'}
+    searcher.s3_manager.s3_client = FakeS3({f"d/f{i:04}.txt": b"" for i in range(2500)})
+    search.invalidate_listing_cache()
+
+    async def collect(**kwargs):
+        return [r['path'] async for batch in searcher.stream_search(**kwargs) for r in batch]
+
+    paths = asyncio.run(collect(query="*.txt"))
+    assert len(paths) == len(set(paths)) == 2501
+    assert "/local.txt" in paths
+    # Stops once max_results are out, without listing the rest of the bucket
+    searcher.s3_manager.s3_client.list_calls = 0
+    search.invalidate_listing_cache()
+    paths = asyncio.run(collect(query="*.txt", max_results=10, search_sources=['s3']))
+    assert len(paths) == len(set(paths)) == 10
+    assert searcher.s3_manager.s3_client.list_calls < 3
+
+def test_s3_content_search_survives_failures():
+    manager = s3_manager({"a.txt": b"hello", "b.txt": b"hello there", "c.txt": b"nope"})
+    get_object = manager.s3_client.get_object
+    def failing_get_object(Bucket, Key, Range=None):
+        if Key == "a.txt":
+            raise RuntimeError("connection reset")
+        return get_object(Bucket, Key, Range)
+    manager.s3_client.get_object = failing_get_object
+    search_content = lambda: asyncio.run(asyncio.wait_for(
+        manager.search_s3_objects("hello", search_type="content"), timeout=10
+    ))
+    assert [r.path for r in search_content()] == ["/b.txt"]
+
+    # Errors outside the per-object search must not leave the search waiting either
+    search_s3_content = manager._search_s3_content
+    def failing_search(bucket, key, *args):
+        if key == "b.txt":
+            raise RuntimeError("decoder crashed")
+        return search_s3_content(bucket, key, *args)
+    manager._search_s3_content = failing_search
+    manager.s3_client.get_object = get_object
+    assert [r.path for r in search_content()] == ["/a.txt"]